@@ -1,23 +1,33 @@
 import os
 import logging
-from flask import Flask, request, jsonify, render_template, send_file
+from flask import Flask, request, jsonify, render_template, send_file, Response, stream_with_context, g
 from werkzeug.utils import secure_filename
 from datetime import datetime
 import json
 import hashlib
-from functools import lru_cache
+import base64
+import copy
+import io
 import threading
 import time
-from collections import defaultdict
+from collections import defaultdict, deque, OrderedDict
 import traceback
-from bidder_manager import bidder_manager
+import atexit
+import glob
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from bidder_manager import get_bidder_manager, BIDDER_FIELDS, BIDDER_DEFAULT_FIELDS
+from bidder_storage import file_lock
+from metrics import (LatencyRecorder, load_recorders, merge_recorders, process_alive, render_prometheus,
+                     summary_family, PROMETHEUS_CONTENT_TYPE)
 
 # Enhanced logging configuration
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('app.log'),
+        logging.FileHandler('app.log', delay=True),  # opened on the first record, not at import
         logging.StreamHandler()
     ]
 )
@@ -28,10 +38,63 @@ app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB limit
 
 # Configuration
 UPLOAD_FOLDER = 'uploads'
-OUTPUT_FOLDER = 'outputs'
+OUTPUT_FOLDER = os.environ.get('OUTPUT_FOLDER', 'outputs')
 ALLOWED_EXTENSIONS = {'xlsx', 'xls'}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB limit
 
+# Parser backend: 'pandas' loads the whole sheet into a DataFrame,
+# 'streaming' walks rows with openpyxl read-only mode and stops after the works section
+PARSER_BACKENDS = ('pandas', 'streaming')
+PARSER_BACKEND = os.environ.get('PARSER_BACKEND', 'pandas')
+STREAM_END_BLANK_ROWS = 10  # Blank rows after the last work that end the works section
+
+# Parse cache keyed on the SHA-256 of the uploaded bytes
+PARSE_CACHE_MAX_ENTRIES = 128
+PARSE_CACHE_TTL = 24 * 60 * 60  # seconds
+PARSE_CACHE_DISK = os.environ.get('PARSE_CACHE_DISK', '1') != '0'
+PARSE_CACHE_DIR = os.path.join(UPLOAD_FOLDER, '.cache')
+
+# Serialized responses of the read-only bidder endpoints, one per distinct query string
+RESPONSE_CACHE_MAX_ENTRIES = 64
+
+# /api/bidders/all pages: default and largest page size (also the chunk size of NDJSON exports)
+BIDDER_PAGE_SIZE = 100
+BIDDER_PAGE_MAX = 1000
+
+# Analytics persistence: events are flushed to an append-only log, then compacted
+ANALYTICS_FILE = os.environ.get('ANALYTICS_FILE', 'analytics.json')
+ANALYTICS_FLUSH_INTERVAL = 5  # seconds
+ANALYTICS_COMPACT_EVENTS = 1000  # Logged events before the log is folded into analytics.json
+ANALYTICS_LATENCY_TTL = 60 * 60  # Seconds another worker's latency file counts without being rewritten
+
+# Progress tracking limits
+PROGRESS_MAX_TASKS = 10000
+PROGRESS_TASK_TTL = 60 * 60  # Seconds a finished task stays pollable
+PROGRESS_MAX_MESSAGES = 20
+
+# Background template generation: /generate?async=1 (or GENERATE_ASYNC=1) queues a job
+GENERATE_ASYNC = os.environ.get('GENERATE_ASYNC', '0') == '1'
+GENERATE_WORKERS = int(os.environ.get('GENERATE_WORKERS', '2'))
+GENERATE_QUEUE_SIZE = int(os.environ.get('GENERATE_QUEUE_SIZE', '8'))  # Waiting jobs beyond the busy workers
+
+# Job and job-progress records shared by all worker processes, so any worker can answer a poll
+JOB_STATE_DIR = os.path.join(OUTPUT_FOLDER, '.jobs')
+JOB_STATE_TTL = 24 * 60 * 60  # Seconds a job record stays pollable
+
+TEMPLATE_TYPES = ['comparison', 'scrutiny', 'evaluation', 'award']
+TEMPLATE_PROCESSES = int(os.environ.get('TEMPLATE_PROCESSES', '0'))  # >1 builds workbooks in a process pool
+# The pool's processes are per host: each of the WEB_CONCURRENCY worker processes (gunicorn's
+# variable) starts its share. Children are started with forkserver where available, else spawn,
+# never forked from a worker whose job threads may hold locks
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', '1'))
+TEMPLATE_START_METHOD = os.environ.get('TEMPLATE_START_METHOD', '')  # '' picks forkserver or spawn
+
+# Uploads are parsed in memory; set UPLOAD_RETENTION=1 to also keep a copy in UPLOAD_FOLDER
+UPLOAD_RETENTION = os.environ.get('UPLOAD_RETENTION', '0') == '1'
+
+# WARM_UP=1 runs warm_up() when the app is imported, before a worker serves its first request
+WARM_UP = os.environ.get('WARM_UP', '0') == '1'
+
 # Create necessary directories
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
@@ -39,110 +102,804 @@ os.makedirs('templates', exist_ok=True)
 
 # Analytics and monitoring
 class Analytics:
-    def __init__(self):
-        self.stats_file = 'analytics.json'
+    """In-memory counters with write-behind persistence shared by worker processes
+    
+    record_upload only touches memory. A background thread appends new events
+    to an append-only log next to the stats file and periodically compacts the
+    log into a fresh snapshot with an atomic rename. Appends and compactions
+    hold a lock file, so any number of processes can share one stats file;
+    each flush also re-reads the snapshot and log, so the in-memory counters
+    include other processes' events.
+    
+    The log starts with a header naming the snapshot it extends. Compaction
+    writes a snapshot with a new id before replacing the log, so a log left
+    behind by a crash between the two steps is recognised as already folded
+    in and never double counted.
+    
+    Latency histograms live in self.latency; each process saves its own next to
+    the stats file so latency_summary() can merge them across workers. A
+    process retires its file on close(), and files of processes that are gone,
+    or not rewritten within latency_ttl, are retired when found: their
+    histograms are folded into one retired file and the file is deleted. The
+    merged counts and sums therefore never drop when a worker exits.
+    """
+    
+    def __init__(self, stats_file=ANALYTICS_FILE, flush_interval=ANALYTICS_FLUSH_INTERVAL,
+                 compact_every=ANALYTICS_COMPACT_EVENTS, latency_ttl=ANALYTICS_LATENCY_TTL):
+        self.stats_file = stats_file
+        self.log_file = f"{stats_file}.log"
+        self.lock_file = f"{stats_file}.lock"
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+        self.lock = threading.Lock()        # Guards stats and pending
+        self.flush_lock = threading.Lock()  # Serializes this process's file writes
+        self.pending = []
+        self.flusher = None
+        self.stopped = threading.Event()
         self.stats = self.load_stats()
+        self.latency = LatencyRecorder()
+        self.latency_ttl = latency_ttl
+        self.latency_file = None  # (pid, path) of this process's latency file
+        self.retired_latency_file = f"{stats_file}.retired-latency.json"
+        self.saved_latency_version = 0
+        self.saved_latency_at = 0.0
     
     def load_stats(self):
+        """Load the snapshot plus the events logged since it"""
         try:
-            if os.path.exists(self.stats_file):
-                with open(self.stats_file, 'r') as f:
-                    loaded = json.load(f)
-                    loaded['file_types'] = defaultdict(int, loaded.get('file_types', {}))
-                    return loaded
+            return self._read_persisted()[0]
         except Exception as e:
             logger.error(f"Error loading analytics: {e}")
+            return self._empty_stats()
+    
+    def _read_persisted(self):
+        """(stats, snapshot id, log usable, logged events) as currently on disk
+        
+        Safe without the lock file: the snapshot and the log are each replaced
+        atomically, and a log that does not extend the snapshot is ignored.
+        """
+        stats = self._empty_stats()
+        snapshot_id = None
+        try:
+            with open(self.stats_file, 'r') as f:
+                loaded = json.load(f)
+            snapshot_id = loaded.pop('_id', None)
+            loaded.pop('processing_times', None)  # Replaced by latency histograms
+            stats.update(loaded)
+            stats['file_types'] = defaultdict(int, loaded.get('file_types', {}))
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            logger.error(f"Ignoring unreadable analytics snapshot {self.stats_file}: {e}")
+        
+        log_usable = False
+        logged_events = 0
+        try:
+            with open(self.log_file, 'r') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            lines = []
+        if lines:
+            try:
+                log_usable = json.loads(lines[0]).get('snapshot', '') == snapshot_id
+            except (ValueError, AttributeError):
+                log_usable = False
+        if log_usable:
+            for line in lines[1:]:
+                try:
+                    event = json.loads(line)
+                    self._apply(stats, event)
+                except (ValueError, KeyError, TypeError):
+                    continue  # Torn line from an unclean shutdown
+                logged_events += 1
+        return stats, snapshot_id, log_usable, logged_events
+    
+    def _empty_stats(self):
         return {
             'total_uploads': 0,
             'successful_generations': 0,
             'errors': 0,
             'file_types': defaultdict(int),
-            'processing_times': [],
             'last_activity': None
         }
     
-    def save_stats(self):
-        try:
-            with open(self.stats_file, 'w') as f:
-                stats_to_save = dict(self.stats)
-                file_types = stats_to_save.get('file_types', {})
-                if isinstance(file_types, defaultdict):
-                    stats_to_save['file_types'] = dict(file_types)
-                json.dump(stats_to_save, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving analytics: {e}")
-    
-    def record_upload(self, filename, file_type, success=True, processing_time=None):
-        self.stats['total_uploads'] += 1
-        self.stats['file_types'][file_type] += 1
-        self.stats['last_activity'] = datetime.now().isoformat()
+    def _apply(self, stats, event):
+        stats['total_uploads'] += 1
+        stats['file_types'][event['file_type']] += 1
+        stats['last_activity'] = max(stats['last_activity'] or '', event['at'])
         
-        if success:
-            self.stats['successful_generations'] += 1
+        if event['success']:
+            stats['successful_generations'] += 1
         else:
-            self.stats['errors'] += 1
-        
-        if processing_time:
-            self.stats['processing_times'].append(processing_time)
-            # Keep only last 100 processing times
-            if len(self.stats['processing_times']) > 100:
-                self.stats['processing_times'] = self.stats['processing_times'][-100:]
-        
-        self.save_stats()
+            stats['errors'] += 1
+    
+    def record_upload(self, filename, file_type, success=True):
+        # Timings go to the latency histograms (record_latency), not the event log
+        event = {
+            'file_type': file_type,
+            'success': bool(success),
+            'at': datetime.now().isoformat()
+        }
+        with self.lock:
+            self._apply(self.stats, event)
+            self.pending.append(event)
+        self._ensure_flusher()
+    
+    def record_latency(self, kind, name, seconds):
+        self.latency.record(kind, name, seconds)
+        self._ensure_flusher()
+    
+    def latency_summary(self):
+        """p50/p90/p99/max per route and stage, merged across this, other live and retired worker processes"""
+        paths = self._live_latency_paths()
+        if os.path.exists(self.retired_latency_file):
+            paths.append(self.retired_latency_file)
+        return self.latency.summary(load_recorders(paths))
+    
+    def _latency_path(self):
+        """This process's latency file; a forked worker, or a later process reusing the PID, gets a new name"""
+        pid = os.getpid()
+        if self.latency_file is None or self.latency_file[0] != pid:
+            if self.latency_file is not None:
+                self.latency.clear()  # Forked: the parent still saves the samples we inherited
+            self.latency_file = (pid, f"{self.stats_file}.latency-{pid}-{uuid.uuid4().hex[:8]}.json")
+            self.saved_latency_version = 0
+        return self.latency_file[1]
+    
+    def _live_latency_paths(self):
+        """Other processes' latency files, retiring those of exited processes and those past latency_ttl"""
+        own_path = self._latency_path()
+        prefix = f"{self.stats_file}.latency-"
+        now = time.time()
+        paths = []
+        stale = []
+        for path in glob.glob(f"{prefix}*.json"):
+            if path == own_path:
+                continue
+            try:
+                pid = int(path[len(prefix):-len('.json')].split('-')[0])
+                live = process_alive(pid) and now - os.path.getmtime(path) <= self.latency_ttl
+            except (ValueError, OSError):
+                live = False
+            (paths if live else stale).append(path)
+        if stale:
+            self._retire_latency(stale)
+        return paths
+    
+    def _retire_latency(self, paths):
+        """Fold latency files into the retired file and delete them
+        
+        Holds the lock file, so a file several processes find stale is folded
+        in once, and never while its owner is saving it.
+        """
+        with file_lock(self.lock_file):
+            paths = [path for path in paths if os.path.exists(path)]
+            if not paths:
+                return
+            recorders = load_recorders(paths)
+            if os.path.exists(self.retired_latency_file):
+                recorders += load_recorders([self.retired_latency_file])
+            self._write_atomic(self.retired_latency_file, json.dumps(merge_recorders(recorders)))
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"Could not delete latency file {path}: {e}")
+    
+    def snapshot(self):
+        """Consistent copy of the stats for display"""
+        with self.lock:
+            return self._copy_stats()
+    
+    def _copy_stats(self):
+        # Caller holds self.lock
+        return dict(self.stats, file_types=dict(self.stats['file_types']))
+    
+    def flush(self, compact=False):
+        """Append pending events to the log, compact when due or asked, and pick up other processes' events"""
+        with self.flush_lock:
+            with self.lock:
+                events, self.pending = self.pending, []
+            try:
+                with file_lock(self.lock_file):
+                    stats, snapshot_id, log_usable, logged_events = self._read_persisted()
+                    if events:
+                        self._append(events, snapshot_id, log_usable)
+                        events, appended = [], events
+                        for event in appended:
+                            self._apply(stats, event)
+                        logged_events += len(appended)
+                    if (compact and logged_events) or logged_events >= self.compact_every:
+                        self._compact(stats)
+                    self._save_latency()
+                with self.lock:
+                    # Events recorded while we were writing are still pending
+                    for event in self.pending:
+                        self._apply(stats, event)
+                    self.stats = stats
+            except Exception as e:
+                logger.error(f"Error saving analytics: {e}")
+                if events:
+                    with self.lock:
+                        self.pending[:0] = events  # Not written; retried on the next flush
+    
+    def _append(self, events, snapshot_id, log_usable):
+        """Append events to the log, starting a fresh log if it is missing or stale (caller holds the lock file)"""
+        lines = ''.join(json.dumps(event) + '\n' for event in events)
+        if not log_usable:
+            self._write_atomic(self.log_file, json.dumps({'snapshot': snapshot_id}) + '\n' + lines)
+            return
+        with open(self.log_file, 'a+') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell():
+                f.seek(f.tell() - 1)
+                if f.read(1) != '\n':
+                    lines = '\n' + lines  # Finish a torn line so it cannot swallow ours
+            f.write(lines)
+    
+    def _save_latency(self):
+        """Write this process's histograms to its latency file when they changed (caller holds the lock file)"""
+        latency_path = self._latency_path()
+        if self.saved_latency_version and not os.path.exists(latency_path):
+            # Another process took us for gone and retired our file, so those samples already count there
+            self.latency.clear()
+            self.latency_file = None  # Start a new file on the next save
+            return
+        latency_version = self.latency.version
+        if latency_version != self.saved_latency_version:
+            self.latency.save(latency_path)
+            self.saved_latency_version = latency_version
+            self.saved_latency_at = time.time()
+        elif latency_version and time.time() - self.saved_latency_at > self.latency_ttl / 2:
+            os.utime(latency_path)  # Still alive, just idle: keep the file from expiring
+            self.saved_latency_at = time.time()
+    
+    def _compact(self, stats):
+        """Atomically replace the snapshot with stats, then start an empty log that extends it"""
+        snapshot_id = uuid.uuid4().hex
+        self._write_atomic(self.stats_file, json.dumps(dict(stats, _id=snapshot_id), indent=2))
+        self._write_atomic(self.log_file, json.dumps({'snapshot': snapshot_id}) + '\n')
+    
+    @staticmethod
+    def _write_atomic(path, text):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    
+    def close(self):
+        """Stop the flusher and persist everything; registered to run at interpreter exit
+        
+        The latency file is retired, so this process's histograms keep counting
+        after it exits.
+        """
+        self.stopped.set()
+        if self.flusher is not None:
+            self.flusher.join(timeout=self.flush_interval + 5)
+            atexit.unregister(self.close)
+        self.flush(compact=True)
+        if self.latency_file is not None and self.latency_file[0] == os.getpid():
+            try:
+                self._retire_latency([self.latency_file[1]])
+            except Exception as e:
+                logger.warning(f"Could not retire latency file {self.latency_file[1]}: {e}")
+    
+    def _ensure_flusher(self):
+        if self.flusher is not None:
+            return
+        with self.lock:
+            if self.flusher is None:
+                self.flusher = threading.Thread(target=self._flush_loop, name='analytics-flusher', daemon=True)
+                self.flusher.start()
+                atexit.register(self.close)
+    
+    def _flush_loop(self):
+        while not self.stopped.wait(self.flush_interval):
+            self.flush()
+
+# Global analytics instance, loaded on first use
+_analytics = None
+_analytics_lock = threading.Lock()
+
+def get_app_analytics():
+    """Return the shared Analytics, reading analytics.json on first use"""
+    global _analytics
+    if _analytics is None:
+        with _analytics_lock:
+            if _analytics is None:
+                _analytics = Analytics()
+    return _analytics
 
-# Global analytics instance
-analytics = Analytics()
+# State files shared between worker processes
+def write_state_file(path, data):
+    """Atomically replace a small JSON state file that other workers may be reading"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def read_state_file(path):
+    """Contents of a state file, or None if it does not exist or cannot be read"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable state file {path}: {e}")
+        return None
+
+def sweep_state_files(directory, suffix, ttl):
+    """Delete state files ending in suffix that were last written more than ttl seconds ago"""
+    now = time.time()
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if name.endswith(suffix):
+            path = os.path.join(directory, name)
+            try:
+                if now - os.path.getmtime(path) > ttl:
+                    os.remove(path)
+            except OSError:
+                pass
 
 # Progress tracking
+class TaskProgress:
+    """Compact per-task progress record"""
+    __slots__ = ('current', 'total', 'status', 'start_time', 'end_time', 'messages', 'shared')
+    
+    def __init__(self, total_steps, max_messages, shared=False):
+        self.shared = shared
+        self.current = 0
+        self.total = total_steps
+        self.status = 'running'
+        self.start_time = time.time()
+        self.end_time = None
+        self.messages = deque(maxlen=max_messages)
+    
+    def to_dict(self):
+        progress = {
+            'current': self.current,
+            'total': self.total,
+            'status': self.status,
+            'start_time': self.start_time,
+            'messages': list(self.messages)
+        }
+        if self.end_time is not None:
+            progress['end_time'] = self.end_time
+        return progress
+
 class ProgressTracker:
-    def __init__(self):
-        self.progress = {}
+    """Bounded task progress store: LRU over max_tasks, finished tasks expire after ttl seconds
+    
+    Tasks started with shared=True are also written to state_dir, so that
+    get_progress answers for them in every worker process, not only the one
+    running the task.
+    """
+    
+    def __init__(self, max_tasks=PROGRESS_MAX_TASKS, ttl=PROGRESS_TASK_TTL, max_messages=PROGRESS_MAX_MESSAGES,
+                 state_dir=None):
+        self.max_tasks = max_tasks
+        self.ttl = ttl
+        self.max_messages = max_messages
+        self.state_dir = state_dir
+        self.sweep_interval = min(ttl, 60)
+        self.last_sweep = time.time()
+        self.progress = OrderedDict()
         self.lock = threading.Lock()
     
-    def start_task(self, task_id, total_steps):
+    def start_task(self, task_id, total_steps, shared=False):
         with self.lock:
-            self.progress[task_id] = {
-                'current': 0,
-                'total': total_steps,
-                'status': 'running',
-                'start_time': time.time(),
-                'messages': []
-            }
+            self.progress.pop(task_id, None)
+            task = self.progress[task_id] = TaskProgress(total_steps, self.max_messages,
+                                                         shared and self.state_dir is not None)
+            while len(self.progress) > self.max_tasks:
+                self.progress.popitem(last=False)
+            self._sweep_expired()
+            shared_state = task.to_dict() if task.shared else None
+        self._write_shared(task_id, shared_state)
     
     def update_progress(self, task_id, step, message=""):
+        shared_state = None
         with self.lock:
-            if task_id in self.progress:
-                self.progress[task_id]['current'] = step
+            task = self.progress.get(task_id)
+            if task is not None:
+                self.progress.move_to_end(task_id)
+                task.current = step
                 if message:
-                    self.progress[task_id]['messages'].append(message)
+                    task.messages.append(message)
+                shared_state = task.to_dict() if task.shared else None
+        self._write_shared(task_id, shared_state)
     
     def complete_task(self, task_id, success=True):
+        shared_state = None
         with self.lock:
-            if task_id in self.progress:
-                self.progress[task_id]['status'] = 'completed' if success else 'failed'
-                self.progress[task_id]['end_time'] = time.time()
+            task = self.progress.get(task_id)
+            if task is not None:
+                self.progress.move_to_end(task_id)
+                task.status = 'completed' if success else 'failed'
+                task.end_time = time.time()
+                shared_state = task.to_dict() if task.shared else None
+        self._write_shared(task_id, shared_state)
     
     def get_progress(self, task_id):
         with self.lock:
-            return self.progress.get(task_id, {})
+            task = self.progress.get(task_id)
+            if task is not None:
+                return task.to_dict()
+        if self.state_dir is None:
+            return {}
+        # Possibly a shared task running in another worker
+        return read_state_file(self._shared_path(task_id)) or {}
+    
+    def _shared_path(self, task_id):
+        return os.path.join(self.state_dir, f"{secure_filename(task_id)}.progress.json")
+    
+    def _write_shared(self, task_id, shared_state):
+        if shared_state is None:
+            return
+        try:
+            write_state_file(self._shared_path(task_id), shared_state)
+        except OSError as e:
+            logger.warning(f"Could not share progress of {task_id}: {e}")
+    
+    def __len__(self):
+        with self.lock:
+            return len(self.progress)
+    
+    def _sweep_expired(self):
+        """Drop finished tasks older than ttl; runs at most once per sweep_interval (caller holds self.lock)"""
+        now = time.time()
+        if now - self.last_sweep < self.sweep_interval:
+            return
+        self.last_sweep = now
+        expired = [task_id for task_id, task in self.progress.items()
+                   if task.end_time is not None and now - task.end_time > self.ttl]
+        for task_id in expired:
+            del self.progress[task_id]
+        if self.state_dir is not None:
+            sweep_state_files(self.state_dir, '.progress.json', self.ttl)
 
 # Global progress tracker
-progress_tracker = ProgressTracker()
+progress_tracker = ProgressTracker(state_dir=JOB_STATE_DIR)
+
+# Parse result cache
+class ParseCache:
+    """LRU + TTL cache of parse results keyed on file content hash, with an optional JSON-per-hash disk tier"""
+    
+    def __init__(self, max_entries=PARSE_CACHE_MAX_ENTRIES, ttl=PARSE_CACHE_TTL, disk_dir=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.entries = OrderedDict()  # key -> (stored_at, result)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key):
+        """Return a copy of the cached result for key, or None"""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(entry[1])
+                del self.entries[key]
+                self.evictions += 1
+        
+        result = self._load_from_disk(key, now)
+        with self.lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, result, now)
+        return copy.deepcopy(result)
+    
+    def put(self, key, result):
+        """Cache result under key in memory and, if enabled, on disk"""
+        result = copy.deepcopy(result)
+        with self.lock:
+            self._store(key, result, time.time())
+        self._save_to_disk(key, result)
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+    
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+            }
+    
+    def _store(self, key, result, stored_at):
+        # Caller holds self.lock
+        self.entries[key] = (stored_at, result)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+    
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+    
+    def _load_from_disk(self, key, now):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            if now - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable parse cache entry {path}: {e}")
+            return None
+    
+    def _save_to_disk(self, key, result):
+        if not self.disk_dir:
+            return
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+            self._prune_disk()
+        except Exception as e:
+            logger.warning(f"Could not write parse cache entry for {key}: {e}")
+    
+    def _prune_disk(self):
+        """Keep the disk tier to max_entries files, dropping expired and then oldest entries"""
+        now = time.time()
+        files = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if now - mtime > self.ttl:
+                os.remove(path)
+            else:
+                files.append((mtime, path))
+        if len(files) > self.max_entries:
+            files.sort()
+            for _, path in files[:len(files) - self.max_entries]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+# Global parse cache
+parse_cache = ParseCache(disk_dir=PARSE_CACHE_DIR if PARSE_CACHE_DISK else None)
+
+# Response cache for read-only endpoints
+class ResponseCache:
+    """LRU cache of serialized JSON bodies and their ETags, each valid for one data version
+    
+    The version is whatever the caller derives its data from (for the bidder
+    endpoints, the BidderManager generation and today's date); an entry built
+    for another version is rebuilt. The ETag hashes the body, so it is strong
+    and agrees between worker processes that serve the same data.
+    """
+    
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (version, etag, body)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key, version):
+        """Return the cached (etag, body) for key, or None when missing or built for another version"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], entry[2]
+            self.misses += 1
+            return None
+    
+    def put(self, key, version, payload):
+        """Serialize payload, cache it for key at version and return (etag, body)"""
+        body = app.json.response(payload).get_data()
+        etag = hashlib.sha256(body).hexdigest()
+        with self.lock:
+            self.entries[key] = (version, etag, body)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return etag, body
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+    
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+# Global response cache for the bidder API
+response_cache = ResponseCache()
+
+def cached_bidder_response(build):
+    """JSON response for a read-only bidder endpoint, built once per bidder data version
+    
+    Keyed on the route and query string; answers If-None-Match with 304.
+    Today's date is part of the version because recent bidders and days_ago
+    move with it. The manager's read methods log failures and return an empty
+    fallback; such a payload is served as is but never cached or given an
+    ETag, so the next request tries again.
+    """
+    manager = get_bidder_manager()
+    manager.refresh()
+    version = (manager.generation, datetime.now().date())
+    key = (request.path, tuple(sorted(request.args.items(multi=True))))
+    cached = response_cache.get(key, version)
+    if cached is None:
+        read_errors = manager.read_errors
+        payload = build()
+        if manager.read_errors != read_errors:
+            return jsonify(payload)
+        cached = response_cache.put(key, version, payload)
+    etag, body = cached
+    response = Response(body, content_type='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'  # revalidate every time; unchanged data costs a 304
+    return response.make_conditional(request)
+
+# Background jobs
+class QueueFullError(Exception):
+    """Raised when a job is submitted while every worker and queue slot is taken"""
+
+class JobQueue:
+    """Bounded worker pool for background jobs with pollable status and results
+    
+    Jobs run in the process that accepted them, and queue limits are per
+    process. With a state_dir, every job record is also written there, so
+    get() finds jobs accepted by other worker processes until state_ttl
+    seconds after their last change.
+    """
+    
+    def __init__(self, workers=GENERATE_WORKERS, queue_size=GENERATE_QUEUE_SIZE, max_finished=1000,
+                 state_dir=None, state_ttl=JOB_STATE_TTL):
+        self.workers = workers
+        self.max_finished = max_finished
+        self.state_dir = state_dir
+        self.state_ttl = state_ttl
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.executor = None
+        self.last_sweep = 0.0
+    
+    def submit(self, func, *args):
+        """Queue func(job_id, *args) and return the job id, or raise QueueFullError"""
+        if not self.slots.acquire(blocking=False):
+            raise QueueFullError("Job queue is full, please retry shortly")
+        job_id = uuid.uuid4().hex
+        job = {'status': 'queued', 'created': time.time()}
+        with self.lock:
+            self.jobs[job_id] = job
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+        try:
+            self._share(job_id, dict(job))
+            self.executor.submit(self._run, job_id, func, args)
+        except Exception:
+            self.slots.release()
+            with self.lock:
+                del self.jobs[job_id]
+            raise
+        return job_id
+    
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job:
+                return dict(job)
+        if self.state_dir is None:
+            return None
+        # Accepted by another worker process
+        return read_state_file(self._state_path(job_id))
+    
+    def status_counts(self):
+        """Number of this process's jobs per status"""
+        with self.lock:
+            counts = {status: 0 for status in ('queued', 'running', 'completed', 'failed')}
+            for job in self.jobs.values():
+                counts[job['status']] += 1
+            return counts
+    
+    def _run(self, job_id, func, args):
+        self._update(job_id, status='running', started=time.time())
+        try:
+            result = func(job_id, *args)
+            self._update(job_id, status='completed', finished=time.time(), result=result)
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            self._update(job_id, status='failed', finished=time.time(), error=str(e))
+        finally:
+            self.slots.release()
+            self._trim()
+    
+    def _update(self, job_id, **fields):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            job = dict(job)
+        self._share(job_id, job)
+    
+    def _state_path(self, job_id):
+        return os.path.join(self.state_dir, f"{secure_filename(job_id)}.job.json")
+    
+    def _share(self, job_id, job):
+        if self.state_dir is None:
+            return
+        try:
+            write_state_file(self._state_path(job_id), job)
+        except OSError as e:
+            logger.warning(f"Could not share state of job {job_id}: {e}")
+    
+    def _trim(self):
+        """Forget the oldest finished jobs beyond max_finished; expire old shared job records"""
+        with self.lock:
+            finished = [job_id for job_id, job in self.jobs.items() if job['status'] in ('completed', 'failed')]
+            for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+                del self.jobs[job_id]
+            now = time.time()
+            sweep = self.state_dir is not None and now - self.last_sweep >= 60
+            if sweep:
+                self.last_sweep = now
+        if sweep:
+            sweep_state_files(self.state_dir, '.job.json', self.state_ttl)
+
+# Global generation queue
+generation_queue = JobQueue(state_dir=JOB_STATE_DIR)
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def validate_file_size(file):
-    """Validate file size with enhanced error handling"""
-    try:
-        file.seek(0, os.SEEK_END)
-        size = file.tell()
-        file.seek(0)
-        return size <= MAX_FILE_SIZE
-    except Exception as e:
-        logger.error(f"Error validating file size: {e}")
-        return False
+def save_upload(payload, filename, digest):
+    """Persist an upload under a content-addressed name so concurrent same-named uploads never collide"""
+    file_path = os.path.join(UPLOAD_FOLDER, f"{digest[:16]}_{filename}")
+    if not os.path.exists(file_path):
+        tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, file_path)
+    return file_path
 
 def validate_percentile(value):
     """Enhanced percentile validation with better error messages"""
@@ -165,85 +922,230 @@ def validate_percentile(value):
         logger.error(f"Error in percentile validation: {e}")
         return False, f"Validation error: {str(e)}"
 
-@lru_cache(maxsize=20)  # Increased cache size
-def parse_input_file_cached(file_path):
-    """Cached version of parse_input_file for better performance"""
-    return parse_input_file(file_path)
+def file_sha256(file_path):
+    """SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def parse_input_file_cached(file_path, backend=None):
+    """Cached version of parse_input_file keyed on file contents, not path"""
+    return _parse_cached(file_sha256(file_path), os.path.basename(file_path), backend,
+                         lambda backend: parse_input_file(file_path, backend=backend))
+
+def parse_input_bytes_cached(payload, filename, backend=None, digest=None):
+    """Cached version of parse_input_bytes; pass digest if the SHA-256 is already known"""
+    digest = digest or hashlib.sha256(payload).hexdigest()
+    return _parse_cached(digest, filename, backend,
+                         lambda backend: parse_input_bytes(payload, filename, backend=backend, digest=digest))
+
+def _parse_cached(digest, filename, backend, parse):
+    """Look up digest in the parse cache, calling parse(backend) on a miss"""
+    start_time = time.time()
+    backend = backend or PARSER_BACKEND
+    key = f"{digest}.{backend}"
+    
+    data = parse_cache.get(key)
+    if data is None:
+        data = parse(backend)
+        parse_cache.put(key, data)
+        data['cached'] = False
+        return data
+    
+    data['filename'] = filename
+    data['processing_time'] = time.time() - start_time
+    data['cached'] = True
+    return data
+
+def _extract_nit_and_works(df):
+    """Find the NIT number and all work rows of a sheet using column-wise string masks"""
+    import numpy as np
+    
+    nit_info = {}
+    works_data = []
+    
+    # Only object columns can hold text; numeric and date columns never match
+    text_columns = [col for col in df.columns if df[col].dtype == object]
+    if not text_columns:
+        return nit_info, works_data
+    
+    # One upper-cased string per row, joined column-wise instead of per row
+    text = df[text_columns]
+    text = text.astype(str).where(text.notna(), '')
+    rows = text[text_columns[0]]
+    for col in text_columns[1:]:
+        rows = rows + ' ' + text[col]
+    rows = rows.str.upper()
+    
+    def row_contains(token):
+        return rows.str.contains(token, regex=False).to_numpy()
+    
+    # NIT number: first row mentioning both NIT and NUMBER
+    nit_rows = np.flatnonzero(row_contains('NIT') & row_contains('NUMBER'))
+    if len(nit_rows):
+        position = int(nit_rows[0])
+        # Look for NIT number in the same row or next row
+        for candidate in (position, position + 1):
+            if candidate >= len(df):
+                break
+            nit_number = _first_text_cell(df.iloc[candidate], lambda cell: any(char.isdigit() for char in cell))
+            if nit_number:
+                nit_info['nit_number'] = nit_number
+                break
+    
+    # Works: rows mentioning WORK that also carry a digit somewhere
+    work_rows = np.flatnonzero(row_contains('WORK'))
+    if len(work_rows):
+        candidates = df.iloc[work_rows].to_numpy(dtype=object)
+        for position, row in zip(work_rows, candidates):
+            # str() of empty cells (None/nan/NaT) never contains a digit
+            if not any(char.isdigit() for cell in row for char in str(cell)):
+                continue
+            work_name = _first_text_cell(row, lambda cell: 'WORK' in cell.upper())
+            if work_name:
+                works_data.append({
+                    'name': work_name,
+                    'row_index': int(df.index[position])
+                })
+    
+    return nit_info, works_data
+
+def _first_text_cell(row, predicate):
+    """Return the first string cell in row matching predicate, stripped"""
+    for cell in row:
+        if isinstance(cell, str) and predicate(cell):
+            return cell.strip()
+    return None
 
-def parse_input_file(file_path):
-    """Enhanced parse input Excel file with better error handling and validation"""
+def _extract_nit_and_works_streaming(source, end_after_blank_rows=STREAM_END_BLANK_ROWS):
+    """Find the NIT number and work rows while streaming the first sheet row by row
+    
+    Uses openpyxl read-only mode so the sheet is never held in memory, and stops
+    once the NIT row has been seen and end_after_blank_rows blank rows follow
+    the last work row.
+    """
+    from openpyxl import load_workbook
+    
+    nit_info = {}
+    works_data = []
+    nit_seen = False
+    nit_pending = False  # NIT label found without a number; check the next row
+    blank_run = 0
+    
+    # Same options pandas uses for its openpyxl reader
+    workbook = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    try:
+        worksheet = workbook.worksheets[0]
+        for index, row in enumerate(worksheet.iter_rows(values_only=True)):
+            row_str = ' '.join(str(cell) for cell in row if cell is not None and cell != '')
+            if not row_str:
+                nit_pending = False
+                blank_run += 1
+                if nit_seen and works_data and blank_run >= end_after_blank_rows:
+                    break
+                continue
+            blank_run = 0
+            row_upper = row_str.upper()
+            
+            if nit_pending:
+                nit_pending = False
+                nit_number = _first_text_cell(row, lambda cell: any(char.isdigit() for char in cell))
+                if nit_number:
+                    nit_info['nit_number'] = nit_number
+            elif not nit_seen and 'NIT' in row_upper and 'NUMBER' in row_upper:
+                nit_seen = True
+                nit_number = _first_text_cell(row, lambda cell: any(char.isdigit() for char in cell))
+                if nit_number:
+                    nit_info['nit_number'] = nit_number
+                else:
+                    nit_pending = True
+            
+            if 'WORK' in row_upper and any(char.isdigit() for char in row_str):
+                work_name = _first_text_cell(row, lambda cell: 'WORK' in cell.upper())
+                if work_name:
+                    works_data.append({
+                        'name': work_name,
+                        'row_index': index
+                    })
+    finally:
+        workbook.close()
+    
+    return nit_info, works_data
+
+def _read_excel_sheet(source):
+    """Read the first sheet of a path or file-like object into a DataFrame without a header row"""
     # Lazy import to avoid heavy dependency when not needed (e.g., in tests)
     try:
         import pandas as pd
     except Exception as import_error:
         raise ImportError("pandas is required to parse Excel files. Please install pandas.") from import_error
-    start_time = time.time()
+    return pd.read_excel(source, header=None, engine='openpyxl')
+
+def parse_input_file(file_path, backend=None):
+    """Enhanced parse input Excel file with better error handling and validation
+    
+    backend selects 'pandas' or 'streaming' (see PARSER_BACKENDS); defaults to PARSER_BACKEND.
+    """
     task_id = f"parse_{hashlib.md5(file_path.encode()).hexdigest()[:8]}"
+    return _parse_excel(file_path, os.path.basename(file_path), backend, task_id)
+
+def parse_input_bytes(payload, filename, backend=None, digest=None):
+    """Parse an uploaded Excel workbook held in memory, without touching disk"""
+    task_id = f"parse_{digest[:8]}" if digest else f"parse_{hashlib.md5(filename.encode()).hexdigest()[:8]}"
+    return _parse_excel(payload, filename, backend, task_id)
+
+def _parse_excel(source, filename, backend, task_id):
+    """Shared parse body; source is a file path or the workbook bytes"""
+    backend = backend or PARSER_BACKEND
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend} (choose from: {', '.join(PARSER_BACKENDS)})")
+    start_time = time.time()
     
     try:
         progress_tracker.start_task(task_id, 5)
         
-        # Check if file exists
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-        
-        progress_tracker.update_progress(task_id, 1, "File found, checking size...")
+        if isinstance(source, str):
+            # Check if file exists
+            if not os.path.exists(source):
+                raise FileNotFoundError(f"File not found: {source}")
+            
+            progress_tracker.update_progress(task_id, 1, "File found, checking size...")
+            file_size = os.path.getsize(source)
+        else:
+            progress_tracker.update_progress(task_id, 1, "File received, checking size...")
+            file_size = len(source)
+            source = io.BytesIO(source)
         
         # Check file size
-        file_size = os.path.getsize(file_path)
         if file_size > MAX_FILE_SIZE:
             raise ValueError(f"File too large: {file_size} bytes (max: {MAX_FILE_SIZE})")
         
         progress_tracker.update_progress(task_id, 2, "Reading Excel file...")
         
-        # Read Excel file with enhanced error handling
-        try:
-            df = pd.read_excel(file_path, header=None, engine='openpyxl')
-        except Exception as e:
-            raise ValueError(f"Failed to read Excel file: {str(e)}")
-        
-        progress_tracker.update_progress(task_id, 3, "Extracting NIT information...")
-        
-        # Extract NIT information with better parsing
-        nit_info = {}
-        works_data = []
-        
-        # Enhanced NIT extraction
-        for index, row in df.iterrows():
-            row_str = ' '.join(str(cell) for cell in row if pd.notna(cell))
-            if 'NIT' in row_str.upper() and 'NUMBER' in row_str.upper():
-                # Look for NIT number in the same row or next row
-                for cell in row:
-                    if pd.notna(cell) and isinstance(cell, str) and any(char.isdigit() for char in cell):
-                        nit_info['nit_number'] = str(cell).strip()
-                        break
-                if not nit_info.get('nit_number'):
-                    # Check next row
-                    if index + 1 < len(df):
-                        for cell in df.iloc[index + 1]:
-                            if pd.notna(cell) and isinstance(cell, str) and any(char.isdigit() for char in cell):
-                                nit_info['nit_number'] = str(cell).strip()
-                                break
-                break
+        if backend == 'streaming':
+            # Rows are scanned as they are read
+            try:
+                nit_info, works_data = _extract_nit_and_works_streaming(source)
+            except Exception as e:
+                raise ValueError(f"Failed to read Excel file: {str(e)}")
+            
+            progress_tracker.update_progress(task_id, 3, "Extracting NIT information...")
+        else:
+            # Read Excel file with enhanced error handling
+            try:
+                df = _read_excel_sheet(source)
+            except Exception as e:
+                raise ValueError(f"Failed to read Excel file: {str(e)}")
+            
+            progress_tracker.update_progress(task_id, 3, "Extracting NIT information...")
+            
+            # Extract NIT information and works data in a single scan
+            nit_info, works_data = _extract_nit_and_works(df)
         
         progress_tracker.update_progress(task_id, 4, "Extracting works data...")
         
-        # Enhanced works extraction
-        for index, row in df.iterrows():
-            row_str = ' '.join(str(cell) for cell in row if pd.notna(cell))
-            if 'WORK' in row_str.upper() and any(char.isdigit() for char in row_str):
-                work_name = None
-                for cell in row:
-                    if pd.notna(cell) and isinstance(cell, str) and 'WORK' in cell.upper():
-                        work_name = str(cell).strip()
-                        break
-                
-                if work_name:
-                    works_data.append({
-                        'name': work_name,
-                        'row_index': index
-                    })
-        
         progress_tracker.update_progress(task_id, 5, "Validation complete...")
         
         if not works_data:
@@ -251,13 +1153,14 @@ def parse_input_file(file_path):
         
         processing_time = time.time() - start_time
         progress_tracker.complete_task(task_id, True)
+        get_app_analytics().latency.record('stages', 'parse', processing_time)
         
         logger.info(f"File parsed successfully in {processing_time:.2f}s")
         
         return {
             'nit_info': nit_info,
             'works': works_data,
-            'filename': os.path.basename(file_path),
+            'filename': filename,
             'processing_time': processing_time
         }
         
@@ -268,102 +1171,141 @@ def parse_input_file(file_path):
         logger.error(f"Traceback: {traceback.format_exc()}")
         raise ValueError(f"Failed to parse input file: {str(e)}")
 
+# Template skeletons: everything except the per-NIT rows, defined once as data
+TEMPLATE_FORMATS = {
+    'header': {
+        'bold': True,
+        'align': 'center',
+        'valign': 'vcenter',
+        'border': 1,
+        'bg_color': '#4472C4',
+        'font_color': 'white',
+        'font_size': 12
+    },
+    'cell': {
+        'align': 'left',
+        'valign': 'vcenter',
+        'border': 1,
+        'font_size': 11
+    },
+    'number': {
+        'align': 'right',
+        'valign': 'vcenter',
+        'border': 1,
+        'num_format': '0.00',
+        'font_size': 11
+    }
+}
+
+TEMPLATE_HEADER_ROW = ['Work Name', 'Number of Bidders', 'Bidder Percentiles', 'Remarks']
+TEMPLATE_WORK_ROW_FORMATS = ['cell', 'number', 'cell', 'cell']  # Name, then empty cells for user input
+TEMPLATE_COLUMN_WIDTHS = [('A:A', 30), ('B:B', 20), ('C:C', 25), ('D:D', 30)]
+
+BOX_IMAGE_PATH = 'Attached_assets/box.png'
+BOX_IMAGE_OPTIONS = {
+    'x_offset': 10,
+    'y_offset': 10,
+    'x_scale': 0.8,
+    'y_scale': 0.8,
+    'positioning': 1  # Move and size with cells
+}
+
+def _template_skeleton(template_type):
+    """Layout for one template type: title, page setup and whether it carries the box image"""
+    if template_type == 'comparison':
+        page = {'landscape': True, 'paper': 9, 'fit_to_pages': (1, 0)}  # A4, 1 page wide
+    else:
+        page = {'landscape': False, 'paper': 9, 'fit_to_pages': (1, 1)}  # A4, 1 page
+    return {
+        'title': f"{template_type.upper()} TEMPLATE",
+        'page': page,
+        'box_image': template_type == 'comparison'
+    }
+
+TEMPLATE_SKELETONS = {template_type: _template_skeleton(template_type) for template_type in TEMPLATE_TYPES}
+
+# Box image bytes, read from disk once per process
+_box_image = None
+_box_image_lock = threading.Lock()
+
+def get_box_image():
+    """Return the box image bytes, loading them on first use; None if the image is missing"""
+    global _box_image
+    with _box_image_lock:
+        if _box_image is None:
+            try:
+                with open(BOX_IMAGE_PATH, 'rb') as f:
+                    _box_image = f.read()
+            except FileNotFoundError:
+                return None
+        return _box_image
+
 def create_excel_template(data, template_type, output_path):
-    """Enhanced Excel template creation with better formatting and error handling"""
+    """Enhanced Excel template creation with better formatting and error handling
+    
+    output_path may also be a file-like object such as BytesIO; the workbook is then built in memory.
+    """
     try:
         # Lazy import to reduce import-time dependencies
         import xlsxwriter
-        workbook = xlsxwriter.Workbook(output_path)
-        
-        # Enhanced formats with better styling
-        header_format = workbook.add_format({
-            'bold': True,
-            'align': 'center',
-            'valign': 'vcenter',
-            'border': 1,
-            'bg_color': '#4472C4',
-            'font_color': 'white',
-            'font_size': 12
-        })
+        in_memory = not isinstance(output_path, str)
+        workbook = xlsxwriter.Workbook(output_path, {'in_memory': True} if in_memory else {})
+        skeleton = TEMPLATE_SKELETONS.get(template_type) or _template_skeleton(template_type)
         
-        cell_format = workbook.add_format({
-            'align': 'left',
-            'valign': 'vcenter',
-            'border': 1,
-            'font_size': 11
-        })
-        
-        number_format = workbook.add_format({
-            'align': 'right',
-            'valign': 'vcenter',
-            'border': 1,
-            'num_format': '0.00',
-            'font_size': 11
-        })
+        formats = {name: workbook.add_format(properties) for name, properties in TEMPLATE_FORMATS.items()}
+        header_format = formats['header']
+        row_formats = [formats[name] for name in TEMPLATE_WORK_ROW_FORMATS]
         
         worksheet = workbook.add_worksheet()
         
         # Set page properties based on template type
-        if template_type == 'comparison':
+        page = skeleton['page']
+        if page['landscape']:
             worksheet.set_landscape()
-            worksheet.set_paper(9)  # A4
-            worksheet.fit_to_pages(1, 0)  # Fit to 1 page wide
         else:
             worksheet.set_portrait()
-            worksheet.set_paper(9)  # A4
-            worksheet.fit_to_pages(1, 1)  # Fit to 1 page
+        worksheet.set_paper(page['paper'])
+        worksheet.fit_to_pages(*page['fit_to_pages'])
         
         # Write title
-        title = f"{template_type.upper()} TEMPLATE"
-        worksheet.merge_range('A1:D1', title, header_format)
+        worksheet.merge_range('A1:D1', skeleton['title'], header_format)
         
         # Write NIT information
         row = 2
         worksheet.write(row, 0, 'NIT Number:', header_format)
-        worksheet.write(row, 1, data['nit_info'].get('nit_number', 'N/A'), cell_format)
+        worksheet.write(row, 1, data['nit_info'].get('nit_number', 'N/A'), formats['cell'])
         
         # Write works data
         row += 2
-        worksheet.write(row, 0, 'Work Name', header_format)
-        worksheet.write(row, 1, 'Number of Bidders', header_format)
-        worksheet.write(row, 2, 'Bidder Percentiles', header_format)
-        worksheet.write(row, 3, 'Remarks', header_format)
+        worksheet.write_row(row, 0, TEMPLATE_HEADER_ROW, header_format)
         
         row += 1
         for work in data['works']:
-            worksheet.write(row, 0, work['name'], cell_format)
-            worksheet.write(row, 1, '', number_format)  # Empty for user input
-            worksheet.write(row, 2, '', cell_format)    # Empty for user input
-            worksheet.write(row, 3, '', cell_format)    # Empty for user input
+            worksheet.write(row, 0, work['name'], row_formats[0])
+            for col in range(1, len(row_formats)):
+                worksheet.write_blank(row, col, None, row_formats[col])  # Empty for user input
             row += 1
         
         # Add box image for comparison sheet with enhanced positioning
-        if template_type == 'comparison':
+        if skeleton['box_image']:
             try:
-                box_image_path = 'Attached_assets/box.png'
-                if os.path.exists(box_image_path):
+                box_image = get_box_image()
+                if box_image is not None:
                     image_row = row + 2
-                    worksheet.insert_image(image_row, 0, box_image_path, {
-                        'x_offset': 10,
-                        'y_offset': 10,
-                        'x_scale': 0.8,
-                        'y_scale': 0.8,
-                        'positioning': 1  # Move and size with cells
-                    })
+                    worksheet.insert_image(image_row, 0, BOX_IMAGE_PATH,
+                                           dict(BOX_IMAGE_OPTIONS, image_data=io.BytesIO(box_image)))
                     logger.info(f"Box image added to comparison sheet at row {image_row}")
                 else:
-                    logger.warning(f"Box image not found at {box_image_path}")
+                    logger.warning(f"Box image not found at {BOX_IMAGE_PATH}")
             except Exception as e:
                 logger.error(f"Error adding box image: {str(e)}")
         
         # Set column widths for better readability
-        worksheet.set_column('A:A', 30)
-        worksheet.set_column('B:B', 20)
-        worksheet.set_column('C:C', 25)
-        worksheet.set_column('D:D', 30)
+        for columns, width in TEMPLATE_COLUMN_WIDTHS:
+            worksheet.set_column(columns, width)
         
         workbook.close()
-        logger.info(f"Template {template_type} created successfully: {output_path}")
+        logger.info(f"Template {template_type} created successfully: {'in memory' if in_memory else output_path}")
         return True
         
     except Exception as e:
@@ -371,33 +1313,244 @@ def create_excel_template(data, template_type, output_path):
         logger.error(f"Traceback: {traceback.format_exc()}")
         raise
 
-def generate_all_templates(data, output_dir):
+# Process pool for parallel workbook generation, created on first use
+_template_pool = None
+_template_pool_lock = threading.Lock()
+
+def template_pool_size():
+    """This worker's share of the host's template processes (TEMPLATE_PROCESSES, or one per CPU)"""
+    return max(1, (TEMPLATE_PROCESSES or os.cpu_count() or 1) // max(WEB_CONCURRENCY, 1))
+
+def _get_template_pool():
+    global _template_pool
+    with _template_pool_lock:
+        if _template_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            
+            start_method = TEMPLATE_START_METHOD or (
+                'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+            _template_pool = ProcessPoolExecutor(max_workers=template_pool_size(),
+                                                 mp_context=multiprocessing.get_context(start_method))
+        return _template_pool
+
+def _discard_template_pool(pool):
+    """Drop a broken pool so the next parallel request starts a fresh one"""
+    global _template_pool
+    with _template_pool_lock:
+        if _template_pool is pool:
+            _template_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _create_template_timed(data, template_type, output_path):
+    """create_excel_template returning its wall time, so pool workers can report it back"""
+    start = time.perf_counter()
+    create_excel_template(data, template_type, output_path)
+    return time.perf_counter() - start
+
+def generate_all_templates(data, output_dir, task_id=None, parallel=None):
     """Enhanced template generation with progress tracking"""
     try:
-        os.makedirs(output_dir, exist_ok=True)
-        
-        templates = ['comparison', 'scrutiny', 'evaluation', 'award']
-        generated_files = []
-        
-        for i, template_type in enumerate(templates):
-            output_path = os.path.join(output_dir, f"{template_type}_template.xlsx")
-            create_excel_template(data, template_type, output_path)
-            generated_files.append(output_path)
-        
-        return generated_files
+        return generate_templates_batch([(data, output_dir)], task_id=task_id, parallel=parallel)[0]
         
     except Exception as e:
         logger.error(f"Error generating templates: {str(e)}")
         raise
 
+def generate_templates_batch(items, task_id=None, parallel=None):
+    """Generate every template for each (data, output_dir) pair
+    
+    With parallel (default: TEMPLATE_PROCESSES > 1) the workbooks of all NITs are
+    spread over a process pool. File lists are returned in input order and the
+    first failing workbook's exception is re-raised.
+    """
+    if parallel is None:
+        parallel = TEMPLATE_PROCESSES > 1
+    
+    plan = []
+    for data, output_dir in items:
+        os.makedirs(output_dir, exist_ok=True)
+        plan.append([(data, template_type, os.path.join(output_dir, f"{template_type}_template.xlsx"))
+                     for template_type in TEMPLATE_TYPES])
+    jobs = [job for nit_jobs in plan for job in nit_jobs]
+    
+    if parallel and len(jobs) > 1:
+        from concurrent.futures.process import BrokenProcessPool
+        
+        pool = _get_template_pool()
+        futures = [pool.submit(_create_template_timed, *job) for job in jobs]
+        try:
+            for step, (future, (_, template_type, output_path)) in enumerate(zip(futures, jobs), 1):
+                try:
+                    get_app_analytics().latency.record('stages', f"template_{template_type}", future.result())
+                except BrokenProcessPool:
+                    _discard_template_pool(pool)
+                    raise
+                except Exception as e:
+                    logger.error(f"Worker failed creating {template_type} template {output_path}: {str(e)}")
+                    raise
+                if task_id:
+                    progress_tracker.update_progress(task_id, step, f"{template_type.title()} template created")
+        finally:
+            for future in futures:
+                future.cancel()
+    else:
+        for step, job in enumerate(jobs, 1):
+            get_app_analytics().latency.record('stages', f"template_{job[1]}", _create_template_timed(*job))
+            if task_id:
+                progress_tracker.update_progress(task_id, step, f"{job[1].title()} template created")
+    
+    return [[output_path for _, _, output_path in nit_jobs] for nit_jobs in plan]
+
+def build_template_bundle(data, bundle_name, task_id=None):
+    """Generate all templates into OUTPUT_FOLDER/<bundle_name> and zip them for download"""
+    output_dir = os.path.join(OUTPUT_FOLDER, bundle_name)
+    generated_files = generate_all_templates(data, output_dir, task_id=task_id)
+    
+    # Create zip file for download
+    import zipfile
+    zip_path = os.path.join(OUTPUT_FOLDER, f"{bundle_name}.zip")
+    with get_app_analytics().latency.time('zip'), zipfile.ZipFile(zip_path, 'w') as zipf:
+        for file_path in generated_files:
+            zipf.write(file_path, os.path.basename(file_path))
+    if task_id:
+        progress_tracker.update_progress(task_id, len(TEMPLATE_TYPES) + 1, "Zip bundle created")
+    
+    return {
+        'download_url': f'/download/{os.path.basename(zip_path)}',
+        'files': [os.path.basename(f) for f in generated_files],
+        'zip_file': os.path.basename(zip_path)
+    }
+
+class _ZipStreamSink(io.RawIOBase):
+    """Unseekable write-only sink that collects zip bytes until the streaming generator drains them"""
+    
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+    
+    def writable(self):
+        return True
+    
+    def write(self, b):
+        self.chunks.append(bytes(b))
+        return len(b)
+    
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+def stream_template_bundle(data):
+    """Yield a zip of all templates chunk by chunk, building one workbook in memory at a time"""
+    import zipfile
+    sink = _ZipStreamSink()
+    with zipfile.ZipFile(sink, 'w') as zipf:
+        for template_type in TEMPLATE_TYPES:
+            workbook = io.BytesIO()
+            with get_app_analytics().latency.time(f"template_{template_type}"):
+                create_excel_template(data, template_type, workbook)
+            with get_app_analytics().latency.time('zip'):
+                zipf.writestr(f"{template_type}_template.xlsx", workbook.getvalue())
+            del workbook
+            yield sink.drain()
+    yield sink.drain()
+
+def run_generation_job(job_id, data, bundle_name):
+    """Background job body: build the bundle while reporting progress under job_id"""
+    progress_tracker.start_task(job_id, len(TEMPLATE_TYPES) + 1, shared=True)
+    try:
+        result = build_template_bundle(data, bundle_name, task_id=job_id)
+    except Exception:
+        progress_tracker.complete_task(job_id, False)
+        get_app_analytics().record_upload('template_generation', 'error', False)
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        raise
+    progress_tracker.complete_task(job_id, True)
+    get_app_analytics().record_upload('template_generation', 'success', True)
+    return result
+
+# Synthetic NIT used to exercise the parse and generate paths during warm-up
+WARM_UP_ROWS = [
+    ['NIT Number', 'WARM-UP/00'],
+    ['S.No.', 'Description'],
+    [1, 'WORK 1 - Warm-up'],
+]
+
+_warmed_up = False
+_warm_up_lock = threading.Lock()
+
+def warm_up():
+    """Pay the first-request costs up front; returns the seconds each step took
+    
+    Imports the heavy modules, loads the bidder indexes, analytics and box
+    image (the template skeletons are built at import), then parses and
+    generates a synthetic NIT in memory. Latency samples from the synthetic
+    run are discarded. Runs once per process.
+    """
+    global _warmed_up
+    with _warm_up_lock:
+        if _warmed_up:
+            return {}
+        timings = {}
+        
+        def step(name, func):
+            start = time.perf_counter()
+            result = func()
+            timings[name] = time.perf_counter() - start
+            return result
+        
+        def import_modules():
+            import pandas, openpyxl, xlsxwriter, zipfile
+            return xlsxwriter
+        
+        xlsxwriter = step('imports', import_modules)
+        step('bidders', get_bidder_manager)
+        analytics = step('analytics', get_app_analytics)
+        step('box_image', get_box_image)
+        
+        def synthetic_workbook():
+            payload = io.BytesIO()
+            workbook = xlsxwriter.Workbook(payload, {'in_memory': True})
+            worksheet = workbook.add_worksheet()
+            for row_index, row in enumerate(WARM_UP_ROWS):
+                worksheet.write_row(row_index, 0, row)
+            workbook.close()
+            return payload.getvalue()
+        
+        payload = synthetic_workbook()
+        recorder, analytics.latency = analytics.latency, LatencyRecorder()
+        try:
+            data = step('parse', lambda: parse_input_bytes(payload, 'warm_up.xlsx'))
+            step('generate', lambda: b''.join(stream_template_bundle(data)))
+        finally:
+            analytics.latency = recorder
+        
+        _warmed_up = True
+        logger.info("Warm-up done: " + ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in timings.items()))
+        return timings
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    """Per-route latency histogram; streamed responses are timed to their first byte"""
+    start = g.get('request_start')
+    if start is not None and request.url_rule is not None:
+        get_app_analytics().record_latency('routes', request.url_rule.rule, time.perf_counter() - start)
+    return response
+
 @app.route('/')
 def index():
     """Enhanced index route with analytics and bidder data"""
     try:
         # Get basic analytics for display
-        stats = analytics.stats
+        stats = get_app_analytics().snapshot()
         
         # Get bidder data for the interface
+        bidder_manager = get_bidder_manager()
         recent_bidders = bidder_manager.get_recent_bidders(7)  # Last 7 days
         popular_bidders = bidder_manager.get_popular_bidders(10)
         bidder_stats = bidder_manager.get_bidder_stats()
@@ -427,20 +1580,24 @@ def upload_file():
         if not allowed_file(file.filename):
             return jsonify({'error': 'Invalid file type. Please upload Excel files only (.xlsx, .xls)'}), 400
         
-        if not validate_file_size(file):
+        # Read the upload once; the same bytes are validated, hashed and parsed
+        with get_app_analytics().latency.time('upload_read'):
+            payload = file.read()
+        if len(payload) > MAX_FILE_SIZE:
             return jsonify({'error': f'File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB'}), 400
         
-        # Save file
         filename = secure_filename(file.filename)
-        file_path = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(file_path)
+        digest = hashlib.sha256(payload).hexdigest()
+        if UPLOAD_RETENTION:
+            with get_app_analytics().latency.time('upload_save'):
+                save_upload(payload, filename, digest)
         
-        # Parse file
-        data = parse_input_file(file_path)
+        # Parse file, reusing the result of an identical earlier upload
+        data = parse_input_bytes_cached(payload, filename, digest=digest)
         
         # Record analytics
         processing_time = time.time() - start_time
-        analytics.record_upload(filename, filename.split('.')[-1], True, processing_time)
+        get_app_analytics().record_upload(filename, filename.split('.')[-1], True)
         
         return jsonify({
             'success': True,
@@ -449,8 +1606,7 @@ def upload_file():
         })
         
     except Exception as e:
-        processing_time = time.time() - start_time
-        analytics.record_upload(file.filename if 'file' in request.files else 'unknown', 'unknown', False, processing_time)
+        get_app_analytics().record_upload(file.filename if 'file' in request.files else 'unknown', 'unknown', False)
         logger.error(f"Upload error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
@@ -463,6 +1619,7 @@ def generate_templates():
             return jsonify({'error': 'No data provided'}), 400
         
         # Enhanced validation with detailed error messages
+        bidder_usages = []
         for work_index, work in enumerate(data.get('works', [])):
             bidders = work.get('bidders', [])
             if not bidders:
@@ -481,35 +1638,145 @@ def generate_templates():
                 if not is_valid:
                     return jsonify({'error': f"Invalid percentile for {work['name']} - {name}: {message}"}), 400
                 
-                # Update bidder usage in database
-                bidder_manager.update_bidder_usage(name, bidder.get('address', ''))
+                bidder_usages.append((name, bidder.get('address', '')))
         
         # Generate templates
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_dir = os.path.join(OUTPUT_FOLDER, f"templates_{timestamp}")
         
-        generated_files = generate_all_templates(data, output_dir)
+        if request.args.get('stream') != '1' and request.args.get('async', '1' if GENERATE_ASYNC else '0') == '1':
+            try:
+                job_id = generation_queue.submit(run_generation_job, data, f"templates_{timestamp}_{uuid.uuid4().hex[:8]}")
+            except QueueFullError as e:
+                return jsonify({'error': str(e)}), 429, {'Retry-After': '5'}
+            # Usage is recorded only once the queue has taken the job, so a rejected retry never counts
+            get_bidder_manager().update_bidders_usage(bidder_usages)
+            return jsonify({
+                'success': True,
+                'job_id': job_id,
+                'progress_url': f'/progress/{job_id}',
+                'result_url': f'/jobs/{job_id}'
+            }), 202
+        
+        # Update bidder usage in database, one write for the whole request
+        get_bidder_manager().update_bidders_usage(bidder_usages)
+        
+        if request.args.get('stream') == '1':
+            # Workbooks are built in memory and zipped straight into the response
+            def stream():
+                try:
+                    yield from stream_template_bundle(data)
+                except Exception as e:
+                    get_app_analytics().record_upload('template_generation', 'error', False)
+                    logger.error(f"Template streaming error: {str(e)}")
+                    raise
+                get_app_analytics().record_upload('template_generation', 'success', True)
+            
+            return Response(stream_with_context(stream()), mimetype='application/zip', headers={
+                'Content-Disposition': f'attachment; filename=templates_{timestamp}.zip'
+            })
         
-        # Create zip file for download
-        import zipfile
-        zip_path = os.path.join(OUTPUT_FOLDER, f"templates_{timestamp}.zip")
-        with zipfile.ZipFile(zip_path, 'w') as zipf:
-            for file_path in generated_files:
-                zipf.write(file_path, os.path.basename(file_path))
+        result = build_template_bundle(data, f"templates_{timestamp}")
         
         # Record successful generation
-        analytics.record_upload('template_generation', 'success', True)
+        get_app_analytics().record_upload('template_generation', 'success', True)
+        
+        return jsonify(dict(result, success=True))
+        
+    except Exception as e:
+        get_app_analytics().record_upload('template_generation', 'error', False)
+        logger.error(f"Template generation error: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return jsonify({'error': str(e)}), 500
+
+def run_batch_job(job_id, inputs, output_dir, input_dir):
+    """Background job body: process a batch while reporting per-file progress under job_id
+    
+    inputs are (name, path) pairs spooled under input_dir, which is removed
+    once the batch is done.
+    """
+    from batch_processor import process_batch
+    
+    done = []
+    done_lock = threading.Lock()
+    
+    def on_item(entry):
+        with done_lock:
+            done.append(entry)
+            progress_tracker.update_progress(job_id, len(done), f"{entry['file']}: {entry['status']}")
+    
+    progress_tracker.start_task(job_id, len(inputs), shared=True)
+    try:
+        summary = process_batch(inputs, output_dir, on_item=on_item)
+    except Exception:
+        progress_tracker.complete_task(job_id, False)
+        get_app_analytics().record_upload('batch_processing', 'error', False)
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        raise
+    finally:
+        shutil.rmtree(input_dir, ignore_errors=True)
+    progress_tracker.complete_task(job_id, True)
+    get_app_analytics().record_upload('batch_processing', 'batch', summary['failed'] == 0)
+    get_app_analytics().record_latency('stages', 'batch', summary['elapsed'])  # runs outside any request timing
+    
+    zip_file = os.path.basename(summary.pop('zip_path'))
+    return dict(summary, download_url=f'/download/{zip_file}', zip_file=zip_file)
+
+@app.route('/batch', methods=['POST'])
+def batch_process():
+    """Queue many NIT workbooks (or zips of them) for one bundle with a per-file manifest
+    
+    Returns 202 with a job id; poll /jobs/<job_id> for the summary and download URL.
+    Workbooks are spooled to disk under the batch folder, so queued batches hold
+    no workbook bytes in memory.
+    """
+    try:
+        from batch_processor import extract_zip, BatchLimitError
+        import zipfile
         
+        uploads = [file for file in request.files.getlist('files') if file.filename]
+        if not uploads:
+            return jsonify({'error': 'No files provided'}), 400
+        
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_dir = os.path.join(OUTPUT_FOLDER, f"batch_{timestamp}_{uuid.uuid4().hex[:8]}")
+        input_dir = os.path.join(output_dir, '.inputs')
+        os.makedirs(input_dir)
+        queued = False
+        try:
+            inputs = []
+            for file in uploads:
+                filename = secure_filename(file.filename)
+                if filename.lower().endswith('.zip'):
+                    try:
+                        inputs.extend(extract_zip(file.stream, input_dir, start=len(inputs)))
+                    except zipfile.BadZipFile:
+                        return jsonify({'error': f'Invalid zip archive: {filename}'}), 400
+                    except BatchLimitError as e:
+                        return jsonify({'error': f'{filename}: {str(e)}'}), 413
+                else:
+                    path = os.path.join(input_dir, f"{len(inputs):04d}")
+                    file.save(path)
+                    inputs.append((filename, path))
+            
+            try:
+                job_id = generation_queue.submit(run_batch_job, inputs, output_dir, input_dir)
+            except QueueFullError as e:
+                return jsonify({'error': str(e)}), 429, {'Retry-After': '5'}
+            queued = True
+        finally:
+            if not queued:
+                shutil.rmtree(output_dir, ignore_errors=True)
         return jsonify({
             'success': True,
-            'download_url': f'/download/{os.path.basename(zip_path)}',
-            'files': [os.path.basename(f) for f in generated_files],
-            'zip_file': os.path.basename(zip_path)
-        })
+            'job_id': job_id,
+            'files': len(inputs),
+            'progress_url': f'/progress/{job_id}',
+            'result_url': f'/jobs/{job_id}'
+        }), 202
         
     except Exception as e:
-        analytics.record_upload('template_generation', 'error', False)
-        logger.error(f"Template generation error: {str(e)}")
+        get_app_analytics().record_upload('batch_processing', 'error', False)
+        logger.error(f"Batch processing error: {str(e)}")
         logger.error(f"Traceback: {traceback.format_exc()}")
         return jsonify({'error': str(e)}), 500
 
@@ -541,15 +1808,78 @@ def get_progress(task_id):
         logger.error(f"Progress error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """Get the status of a background generation job, with the download URL once finished"""
+    try:
+        job = generation_queue.get(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        if job['status'] == 'completed':
+            return jsonify(dict(job['result'], success=True, status='completed'))
+        if job['status'] == 'failed':
+            return jsonify({'status': 'failed', 'error': job['error']}), 500
+        return jsonify({'status': job['status'], 'progress': progress_tracker.get_progress(job_id)}), 202
+    except Exception as e:
+        logger.error(f"Job status error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/analytics')
 def get_analytics():
     """Get application analytics"""
     try:
-        return jsonify(analytics.stats)
+        analytics = get_app_analytics()
+        return jsonify(dict(analytics.snapshot(), parse_cache=parse_cache.stats(),
+                            response_cache=response_cache.stats(), latency=analytics.latency_summary()))
     except Exception as e:
         logger.error(f"Analytics error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of request, stage, cache and store metrics"""
+    try:
+        analytics = get_app_analytics()
+        stats = analytics.snapshot()
+        latency = analytics.latency_summary()
+        routes = latency.get('routes', {})
+        cache_stats = parse_cache.stats()
+        response_stats = response_cache.stats()
+        manager = get_bidder_manager()
+        manager.refresh()
+        bidder_count = len(manager.bidders)
+        families = [
+            ('tender_http_requests_total', 'counter', 'Requests handled per route',
+             [('', {'route': route}, summary['count']) for route, summary in routes.items()]),
+            summary_family('tender_http_request_duration_seconds', 'Request latency per route', 'route', routes),
+            summary_family('tender_stage_duration_seconds', 'Latency of parse, template and zip stages', 'stage',
+                           latency.get('stages', {})),
+            ('tender_uploads_total', 'counter', 'Recorded uploads and generations',
+             [('', {}, stats['total_uploads'])]),
+            ('tender_errors_total', 'counter', 'Recorded failed uploads and generations',
+             [('', {}, stats['errors'])]),
+            ('tender_parse_cache_requests_total', 'counter', 'Parse cache lookups by result',
+             [('', {'result': 'hit'}, cache_stats['hits']), ('', {'result': 'disk_hit'}, cache_stats['disk_hits']),
+              ('', {'result': 'miss'}, cache_stats['misses'])]),
+            ('tender_parse_cache_hit_ratio', 'gauge', 'Share of parse cache lookups served from cache',
+             [('', {}, float(cache_stats['hit_ratio']))]),
+            ('tender_parse_cache_entries', 'gauge', 'Parsed results held in memory',
+             [('', {}, cache_stats['entries'])]),
+            ('tender_response_cache_requests_total', 'counter', 'Bidder API response cache lookups by result',
+             [('', {'result': 'hit'}, response_stats['hits']), ('', {'result': 'miss'}, response_stats['misses'])]),
+            ('tender_progress_tasks', 'gauge', 'Tasks held by the progress tracker',
+             [('', {}, len(progress_tracker))]),
+            ('tender_generation_jobs', 'gauge', 'Background generation jobs by status',
+             [('', {'status': status}, count) for status, count in generation_queue.status_counts().items()]),
+            ('tender_bidders', 'gauge', 'Bidders in the bidder database',
+             [('', {}, bidder_count)]),
+        ]
+        return Response(render_prometheus(families), content_type=PROMETHEUS_CONTENT_TYPE)
+    except Exception as e:
+        logger.error(f"Metrics error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/bidders/search')
 def search_bidders():
     """Search bidders by name or address"""
@@ -560,7 +1890,7 @@ def search_bidders():
         if not query:
             return jsonify({'bidders': []})
         
-        results = bidder_manager.search_bidders(query, limit)
+        results = get_bidder_manager().search_bidders(query, limit)
         return jsonify({'bidders': results})
         
     except Exception as e:
@@ -572,8 +1902,7 @@ def get_recent_bidders():
     """Get recently used bidders"""
     try:
         days = int(request.args.get('days', 30))
-        bidders = bidder_manager.get_recent_bidders(days)
-        return jsonify({'bidders': bidders})
+        return cached_bidder_response(lambda: {'bidders': get_bidder_manager().get_recent_bidders(days)})
         
     except Exception as e:
         logger.error(f"Recent bidders error: {str(e)}")
@@ -584,8 +1913,7 @@ def get_popular_bidders():
     """Get popular bidders"""
     try:
         limit = int(request.args.get('limit', 10))
-        bidders = bidder_manager.get_popular_bidders(limit)
-        return jsonify({'bidders': bidders})
+        return cached_bidder_response(lambda: {'bidders': get_bidder_manager().get_popular_bidders(limit)})
         
     except Exception as e:
         logger.error(f"Popular bidders error: {str(e)}")
@@ -597,8 +1925,10 @@ def get_bidder_suggestions():
     try:
         partial_name = request.args.get('q', '').strip()
         limit = int(request.args.get('limit', 5))
+        if limit < 0:
+            return jsonify({'error': 'limit must not be negative'}), 400
         
-        suggestions = bidder_manager.get_bidder_suggestions(partial_name, limit)
+        suggestions = get_bidder_manager().get_bidder_suggestions(partial_name, limit)
         return jsonify({'suggestions': suggestions})
         
     except Exception as e:
@@ -609,19 +1939,68 @@ def get_bidder_suggestions():
 def get_bidder_stats():
     """Get bidder database statistics"""
     try:
-        stats = bidder_manager.get_bidder_stats()
-        return jsonify(stats)
+        return cached_bidder_response(get_bidder_manager().get_bidder_stats)
         
     except Exception as e:
         logger.error(f"Bidder stats error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def encode_bidder_cursor(name):
+    """Opaque cursor for the page after the bidder called name"""
+    return base64.urlsafe_b64encode(name.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_bidder_cursor(cursor):
+    try:
+        return base64.b64decode(cursor + '=' * (-len(cursor) % 4), altchars=b'-_', validate=True).decode('utf-8')
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+
+def parse_bidder_fields(value):
+    """Field list from a comma-separated ?fields= value, defaulting to BIDDER_DEFAULT_FIELDS"""
+    if not value:
+        return BIDDER_DEFAULT_FIELDS
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in BIDDER_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)} (choose from: {', '.join(BIDDER_FIELDS)})")
+    return fields
+
 @app.route('/api/bidders/all')
 def get_all_bidders():
-    """Get all bidders"""
+    """Get bidders in name order, one page at a time
+    
+    ?limit= sets the page size (at most BIDDER_PAGE_MAX), ?cursor= continues
+    from a previous page's next_cursor and ?fields=name,... projects each
+    bidder. ?format=ndjson streams every bidder as one JSON object per line.
+    """
     try:
-        bidders = bidder_manager.get_all_bidders()
-        return jsonify({'bidders': bidders})
+        try:
+            fields = parse_bidder_fields(request.args.get('fields'))
+            limit = min(max(int(request.args.get('limit', BIDDER_PAGE_SIZE)), 1), BIDDER_PAGE_MAX)
+            cursor = request.args.get('cursor')
+            after = decode_bidder_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if request.args.get('format') == 'ndjson':
+            # Pages are read under the manager lock one at a time, never the whole database
+            def stream():
+                name = after
+                while True:
+                    page, name = get_bidder_manager().get_bidders_page(name, BIDDER_PAGE_MAX, fields)
+                    yield ''.join(json.dumps(bidder, ensure_ascii=False) + '\n' for bidder in page)
+                    if name is None:
+                        break
+            
+            return Response(stream_with_context(stream()), mimetype='application/x-ndjson', headers={
+                'Content-Disposition': 'attachment; filename=bidders.ndjson'
+            })
+        
+        def build():
+            page, last_name = get_bidder_manager().get_bidders_page(after, limit, fields)
+            return {'bidders': page, 'next_cursor': encode_bidder_cursor(last_name) if last_name else None}
+        
+        return cached_bidder_response(build)
         
     except Exception as e:
         logger.error(f"All bidders error: {str(e)}")
@@ -640,5 +2019,11 @@ def internal_error(error):
     logger.error(f"Internal server error: {error}")
     return jsonify({'error': 'Internal server error'}), 500
 
+if WARM_UP:
+    import multiprocessing
+    
+    if multiprocessing.parent_process() is None:  # not in a template pool child
+        warm_up()
+
 if __name__ == '__main__':
     app.run(debug=False, host='0.0.0.0', port=5000)
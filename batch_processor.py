@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Batch Processor Module
+Parses many NIT workbooks concurrently and generates all templates for each,
+producing one zip bundle with a per-file manifest
+
+Usage: python batch_processor.py <files, folders or zips>... [-o OUTPUT_DIR] [-w WORKERS]
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', '4'))
+BATCH_EXTENSIONS = ('.xlsx',)
+
+# Zip archives are checked against these limits before any member is decompressed
+BATCH_MAX_MEMBERS = int(os.environ.get('BATCH_MAX_MEMBERS', '500'))
+BATCH_MAX_MEMBER_SIZE = 10 * 1024 * 1024  # Same as a single upload (app.MAX_FILE_SIZE)
+BATCH_MAX_TOTAL_SIZE = int(os.environ.get('BATCH_MAX_TOTAL_SIZE', str(200 * 1024 * 1024)))
+
+class BatchLimitError(ValueError):
+    """Raised when a zip archive holds too many members or too many uncompressed bytes"""
+
+def collect_inputs(paths: Iterable[str]) -> List[Tuple[str, bytes]]:
+    """Expand files, folders and zip archives into (name, workbook bytes) pairs"""
+    inputs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(BATCH_EXTENSIONS + ('.zip',)):
+                    inputs.extend(collect_inputs([os.path.join(path, name)]))
+        elif path.lower().endswith('.zip'):
+            with open(path, 'rb') as f:
+                inputs.extend(expand_zip(f))
+        else:
+            with open(path, 'rb') as f:
+                inputs.append((os.path.basename(path), f.read()))
+    return inputs
+
+def expand_zip(file_obj, max_members: int = BATCH_MAX_MEMBERS, max_member_size: int = BATCH_MAX_MEMBER_SIZE,
+               max_total_size: int = BATCH_MAX_TOTAL_SIZE) -> List[Tuple[str, bytes]]:
+    """Read every workbook in a zip archive into (name, bytes) pairs
+
+    The uncompressed sizes in the archive directory are checked against the
+    limits before anything is read, raising BatchLimitError. zipfile never
+    inflates a member beyond its recorded size, so a lying header cannot get
+    around the limits.
+    """
+    with zipfile.ZipFile(file_obj) as archive:
+        members = _checked_members(archive, max_members, max_member_size, max_total_size)
+        return [(os.path.basename(info.filename), archive.read(info)) for info in members]
+
+def extract_zip(file_obj, directory: str, start: int = 0, max_members: int = BATCH_MAX_MEMBERS,
+                max_member_size: int = BATCH_MAX_MEMBER_SIZE,
+                max_total_size: int = BATCH_MAX_TOTAL_SIZE) -> List[Tuple[str, str]]:
+    """Stream every workbook in a zip archive into directory, returning (name, path) pairs
+
+    Same limits as expand_zip. Members are written to numbered files counting
+    from start, so same-named members never collide and nothing is held in memory.
+    """
+    with zipfile.ZipFile(file_obj) as archive:
+        inputs = []
+        for index, info in enumerate(_checked_members(archive, max_members, max_member_size, max_total_size), start):
+            path = os.path.join(directory, f"{index:04d}")
+            with archive.open(info) as source, open(path, 'wb') as target:
+                shutil.copyfileobj(source, target)
+            inputs.append((os.path.basename(info.filename), path))
+        return inputs
+
+def _checked_members(archive: zipfile.ZipFile, max_members: int, max_member_size: int,
+                     max_total_size: int) -> List[zipfile.ZipInfo]:
+    """Workbook members of archive, raising BatchLimitError if they exceed the limits"""
+    members = [info for info in archive.infolist()
+               if not info.is_dir() and not os.path.basename(info.filename).startswith(('.', '~$'))]
+    if len(members) > max_members:
+        raise BatchLimitError(f"Zip archive holds {len(members)} files (limit {max_members})")
+    total_size = 0
+    for info in members:
+        if info.file_size > max_member_size:
+            raise BatchLimitError(f"{info.filename} is {info.file_size} bytes uncompressed "
+                                  f"(limit {max_member_size})")
+        total_size += info.file_size
+    if total_size > max_total_size:
+        raise BatchLimitError(f"Zip archive is {total_size} bytes uncompressed (limit {max_total_size})")
+    return members
+
+def _safe_stem(name: str) -> str:
+    stem = os.path.splitext(os.path.basename(name))[0]
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', stem).strip('._') or 'nit'
+
+def _process_one(index: int, name: str, payload: Union[bytes, str], output_dir: str,
+                 parallel_templates: Optional[bool]) -> Dict:
+    """Parse one workbook (its bytes, or the file they were spooled to) and generate its templates
+
+    Returns the workbook's manifest entry.
+    """
+    from app import parse_input_bytes, generate_all_templates
+
+    entry = {'file': name}
+    start_time = time.time()
+    try:
+        if not name.lower().endswith(BATCH_EXTENSIONS):
+            raise ValueError(f"Unsupported file type: {name}")
+        if isinstance(payload, str):
+            with open(payload, 'rb') as f:
+                payload = f.read()
+        data = parse_input_bytes(payload, name)
+        nit_dir = os.path.join(output_dir, f"{index + 1:03d}_{_safe_stem(name)}")
+        files = generate_all_templates(data, nit_dir, parallel=parallel_templates)
+        entry.update({
+            'status': 'success',
+            'nit_number': data['nit_info'].get('nit_number', ''),
+            'works': len(data['works']),
+            'templates': [os.path.relpath(path, output_dir) for path in files]
+        })
+    except Exception as e:
+        logger.error(f"Batch item {name} failed: {e}")
+        entry.update({'status': 'error', 'error': str(e)})
+    entry['processing_time'] = round(time.time() - start_time, 4)
+    return entry
+
+def process_batch(inputs: List[Tuple[str, Union[bytes, str]]], output_dir: str, workers: int = BATCH_WORKERS,
+                  parallel_templates: Optional[bool] = None,
+                  on_item: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Process (name, bytes or path) workbooks with bounded concurrency and bundle the results
+
+    A path is read only when its turn comes, so at most workers payloads are
+    in memory. on_item, if given, is called with each manifest entry as its
+    file finishes.
+    Returns a summary with the zip path, the per-file manifest and throughput.
+    """
+    start_time = time.time()
+    os.makedirs(output_dir, exist_ok=True)
+
+    def process(item):
+        index, (name, payload) = item
+        entry = _process_one(index, name, payload, output_dir, parallel_templates)
+        if on_item:
+            on_item(entry)
+        return entry
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        manifest = list(pool.map(process, enumerate(inputs)))
+
+    succeeded = sum(1 for entry in manifest if entry['status'] == 'success')
+    elapsed = time.time() - start_time
+    summary = {
+        'total': len(manifest),
+        'succeeded': succeeded,
+        'failed': len(manifest) - succeeded,
+        'elapsed': round(elapsed, 4),
+        'files_per_second': round(len(manifest) / elapsed, 2) if elapsed else 0.0,
+        'manifest': manifest
+    }
+
+    zip_path = f"{output_dir.rstrip(os.sep)}.zip"
+    with zipfile.ZipFile(zip_path, 'w') as zipf:
+        for entry in manifest:
+            for relative_path in entry.get('templates', []):
+                zipf.write(os.path.join(output_dir, relative_path), relative_path)
+        zipf.writestr('manifest.json', json.dumps(summary, indent=2))
+    summary['zip_path'] = zip_path
+
+    logger.info(f"Batch of {summary['total']} files done in {elapsed:.2f}s ({summary['files_per_second']} files/s)")
+    return summary
+
+def main(argv: Optional[List[str]] = None) -> bool:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description='Generate tender templates for many NIT workbooks at once')
+    parser.add_argument('inputs', nargs='+', help='.xlsx files, folders of them, or .zip archives')
+    parser.add_argument('-o', '--output-dir', help='Output folder (default: outputs/batch_<timestamp>)')
+    parser.add_argument('-w', '--workers', type=int, default=BATCH_WORKERS, help='Files processed concurrently')
+    parser.add_argument('--parallel-templates', action='store_true', help='Build workbooks in a process pool')
+    args = parser.parse_args(argv)
+
+    output_dir = args.output_dir or os.path.join('outputs', f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    inputs = collect_inputs(args.inputs)
+    if not inputs:
+        print("❌ No input workbooks found")
+        return False
+
+    print(f"🚀 Processing {len(inputs)} workbooks with {args.workers} workers...")
+    summary = process_batch(inputs, output_dir, args.workers, args.parallel_templates or None)
+
+    for entry in summary['manifest']:
+        if entry['status'] == 'success':
+            print(f"   ✅ {entry['file']}: NIT {entry['nit_number'] or 'N/A'}, {entry['works']} works")
+        else:
+            print(f"   ❌ {entry['file']}: {entry['error']}")
+    print("=" * 50)
+    print(f"📊 {summary['succeeded']}/{summary['total']} succeeded in {summary['elapsed']:.2f}s "
+          f"({summary['files_per_second']} files/second)")
+    print(f"📦 Bundle: {summary['zip_path']}")
+    return summary['failed'] == 0
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
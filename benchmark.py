@@ -0,0 +1,604 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the Tender Processing Application
+Measures the hot paths on synthetic data without running the web server
+
+Usage: python benchmark.py [parse] [backends] [templates] [skeleton] [progress] [search] [suggest] [index] [responses] [startup] [warmup]
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+PARSE_ROW_COUNTS = [10_000, 50_000, 100_000]
+TEMPLATE_NIT_COUNTS = [1, 10, 100]
+BIDDER_COUNTS = [1_000, 10_000, 100_000]
+SEARCH_QUERIES = ['electric', 'jaipur', 'sha', 'shree ganesh', 'builders 4217', 'zzq']
+INDEX_BIDDER_COUNT = 50_000
+SUGGEST_PREFIXES = ['a', 'sh', 'jai ambe b', 'krishna enterprises 99', 'zz']
+
+BIDDER_FIRST_WORDS = ['Arun', 'Ashapura', 'Bhawani', 'Shree Ganesh', 'Mahaveer', 'Krishna', 'Jai Ambe', 'Laxmi']
+BIDDER_TRADES = ['Electricals', 'Electric Works', 'Construction', 'Builders', 'Air Systems', 'Enterprises']
+BIDDER_CITIES = ['Jaipur', 'Udaipur', 'Pali', 'Jodhpur', 'Ajmer', 'Kota', 'Bikaner', 'Bhilwara']
+
+def make_generate_data(nit, works=10, bidders=5):
+    """Build /generate payload data for one synthetic NIT"""
+    return {
+        'nit_info': {'nit_number': f'{nit:02d}/2025-26'},
+        'works': [
+            {
+                'name': f'WORK {w + 1} - Electrification of block {w + 1}',
+                'bidders': [{'name': f'Contractor {b + 1}', 'percentile': b - 2.5} for b in range(bidders)]
+            }
+            for w in range(works)
+        ]
+    }
+
+def make_nit_records(rows, works_every=10):
+    """Build synthetic NIT sheet rows: a header block and a work row every few rows"""
+    records = [
+        ['OFFICE OF THE EXECUTIVE ENGINEER', None, None, None, None],
+        ['NIT Number', '03/2025-26', None, None, None],
+        ['Date of Opening', '15/01/2025', None, None, None],
+        ['S.No.', 'Description', 'Time of Completion', 'Earnest Money', 'Estimated Cost'],
+    ]
+    for i in range(rows - len(records)):
+        if i % works_every == 0:
+            records.append([i // works_every + 1, f'WORK {i // works_every + 1} - Electrification of block', '3 months', 5000.0, 125000.0])
+        else:
+            records.append([None, f'Item {i} supply and fixing of fittings', None, None, float(i)])
+    return records
+
+def make_nit_sheet(rows, works_every=10):
+    """Build a synthetic NIT sheet as a DataFrame"""
+    import pandas as pd
+
+    return pd.DataFrame(make_nit_records(rows, works_every))
+
+def write_nit_workbook(rows, trailer_rows=0):
+    """Write a synthetic NIT workbook, optionally followed by a blank gap and terms rows"""
+    import xlsxwriter
+
+    handle, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(handle)
+    records = make_nit_records(rows)
+    if trailer_rows:
+        records += [[None] * 5] * 20
+        records += [[None, f'Condition {i}: the contractor shall comply with the rules', None, None, None] for i in range(trailer_rows)]
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    worksheet = workbook.add_worksheet()
+    for row, record in enumerate(records):
+        for col, value in enumerate(record):
+            if value is not None:
+                worksheet.write(row, col, value)
+    workbook.close()
+    return path
+
+def legacy_extract(df):
+    """Reference implementation: the original two-pass iterrows scan"""
+    import pandas as pd
+
+    nit_info = {}
+    works_data = []
+    for index, row in df.iterrows():
+        row_str = ' '.join(str(cell) for cell in row if pd.notna(cell))
+        if 'NIT' in row_str.upper() and 'NUMBER' in row_str.upper():
+            for cell in row:
+                if pd.notna(cell) and isinstance(cell, str) and any(char.isdigit() for char in cell):
+                    nit_info['nit_number'] = str(cell).strip()
+                    break
+            if not nit_info.get('nit_number'):
+                if index + 1 < len(df):
+                    for cell in df.iloc[index + 1]:
+                        if pd.notna(cell) and isinstance(cell, str) and any(char.isdigit() for char in cell):
+                            nit_info['nit_number'] = str(cell).strip()
+                            break
+            break
+    for index, row in df.iterrows():
+        row_str = ' '.join(str(cell) for cell in row if pd.notna(cell))
+        if 'WORK' in row_str.upper() and any(char.isdigit() for char in row_str):
+            work_name = None
+            for cell in row:
+                if pd.notna(cell) and isinstance(cell, str) and 'WORK' in cell.upper():
+                    work_name = str(cell).strip()
+                    break
+            if work_name:
+                works_data.append({'name': work_name, 'row_index': index})
+    return nit_info, works_data
+
+def timed(func, *args):
+    """Run func once and return (result, elapsed seconds)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def bench_parse():
+    """Compare the legacy iterrows scan with the vectorized single-pass extraction"""
+    from app import _extract_nit_and_works
+
+    print("🧪 NIT/works extraction (rows/second)")
+    print(f"   {'rows':>8}  {'legacy':>12}  {'vectorized':>12}  {'speedup':>8}")
+    for rows in PARSE_ROW_COUNTS:
+        df = make_nit_sheet(rows)
+        expected, legacy_time = timed(legacy_extract, df)
+        actual, fast_time = timed(_extract_nit_and_works, df)
+        if actual != expected:
+            print(f"   ❌ Output mismatch at {rows} rows")
+            return False
+        print(f"   {rows:>8}  {rows / legacy_time:>12,.0f}  {rows / fast_time:>12,.0f}  {legacy_time / fast_time:>7.1f}x")
+    return True
+
+# Runs in a fresh interpreter so import cost and peak RSS belong to one backend
+BACKEND_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from app import parse_input_file
+data = parse_input_file(sys.argv[1], backend=sys.argv[2])
+elapsed = time.perf_counter() - start
+try:
+    import resource
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_kb = peak_kb // 1024 if sys.platform == 'darwin' else peak_kb
+except ImportError:
+    peak_kb = None
+print(json.dumps({'elapsed': elapsed, 'peak_kb': peak_kb, 'works': len(data['works'])}))
+"""
+
+def probe_backend(path, backend):
+    """Parse path with backend in a cold subprocess and return its measurements"""
+    import json
+
+    result = subprocess.run(
+        [sys.executable, '-c', BACKEND_PROBE, path, backend],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def bench_backends():
+    """Compare cold-start latency and peak RSS of the pandas and streaming parsers"""
+    from app import PARSER_BACKENDS
+
+    print("🧪 Parser backends (cold process, sheet followed by 20% terms rows)")
+    print(f"   {'rows':>8}  {'backend':>10}  {'latency':>9}  {'peak RSS':>10}  {'works':>6}")
+    for rows in PARSE_ROW_COUNTS:
+        path = write_nit_workbook(rows, trailer_rows=rows // 5)
+        try:
+            works = set()
+            for backend in PARSER_BACKENDS:
+                stats = probe_backend(path, backend)
+                peak = f"{stats['peak_kb'] / 1024:.0f} MB" if stats['peak_kb'] else 'n/a'
+                print(f"   {rows:>8}  {backend:>10}  {stats['elapsed']:>8.2f}s  {peak:>10}  {stats['works']:>6}")
+                works.add(stats['works'])
+            if len(works) != 1:
+                print(f"   ❌ Backends disagree on works count at {rows} rows")
+                return False
+        finally:
+            os.remove(path)
+    return True
+
+def bench_templates():
+    """Compare serial and process-parallel template generation for batches of NITs"""
+    from app import generate_templates_batch, _get_template_pool
+
+    # Start the pool workers up front so the timings show steady-state throughput
+    pool = _get_template_pool()
+    list(pool.map(abs, range(pool._max_workers)))
+
+    print(f"🧪 Template generation, 4 workbooks per NIT ({pool._max_workers} worker processes)")
+    print(f"   {'NITs':>6}  {'serial':>9}  {'parallel':>9}  {'speedup':>8}")
+    for nits in TEMPLATE_NIT_COUNTS:
+        output_root = tempfile.mkdtemp(prefix='bench_templates_')
+        try:
+            timings = {}
+            for mode in ('serial', 'parallel'):
+                items = [(make_generate_data(n), os.path.join(output_root, mode, f'nit_{n}')) for n in range(nits)]
+                files, timings[mode] = timed(lambda: generate_templates_batch(items, parallel=(mode == 'parallel')))
+                if sum(len(nit_files) for nit_files in files) != 4 * nits:
+                    print(f"   ❌ Missing workbooks for {nits} NITs ({mode})")
+                    return False
+            print(f"   {nits:>6}  {timings['serial']:>8.2f}s  {timings['parallel']:>8.2f}s  {timings['serial'] / timings['parallel']:>7.1f}x")
+        finally:
+            shutil.rmtree(output_root)
+    return True
+
+def legacy_create_template(data, template_type, output_path):
+    """Reference implementation: rebuilds formats and layout and reads box.png on every call"""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(output_path, {'in_memory': True})
+    header_format = workbook.add_format({'bold': True, 'align': 'center', 'valign': 'vcenter', 'border': 1,
+                                         'bg_color': '#4472C4', 'font_color': 'white', 'font_size': 12})
+    cell_format = workbook.add_format({'align': 'left', 'valign': 'vcenter', 'border': 1, 'font_size': 11})
+    number_format = workbook.add_format({'align': 'right', 'valign': 'vcenter', 'border': 1,
+                                         'num_format': '0.00', 'font_size': 11})
+    worksheet = workbook.add_worksheet()
+    if template_type == 'comparison':
+        worksheet.set_landscape()
+        worksheet.set_paper(9)
+        worksheet.fit_to_pages(1, 0)
+    else:
+        worksheet.set_portrait()
+        worksheet.set_paper(9)
+        worksheet.fit_to_pages(1, 1)
+    worksheet.merge_range('A1:D1', f"{template_type.upper()} TEMPLATE", header_format)
+    row = 2
+    worksheet.write(row, 0, 'NIT Number:', header_format)
+    worksheet.write(row, 1, data['nit_info'].get('nit_number', 'N/A'), cell_format)
+    row += 2
+    for col, header in enumerate(['Work Name', 'Number of Bidders', 'Bidder Percentiles', 'Remarks']):
+        worksheet.write(row, col, header, header_format)
+    row += 1
+    for work in data['works']:
+        worksheet.write(row, 0, work['name'], cell_format)
+        worksheet.write(row, 1, '', number_format)
+        worksheet.write(row, 2, '', cell_format)
+        worksheet.write(row, 3, '', cell_format)
+        row += 1
+    if template_type == 'comparison' and os.path.exists('Attached_assets/box.png'):
+        worksheet.insert_image(row + 2, 0, 'Attached_assets/box.png',
+                               {'x_offset': 10, 'y_offset': 10, 'x_scale': 0.8, 'y_scale': 0.8, 'positioning': 1})
+    for columns, width in (('A:A', 30), ('B:B', 20), ('C:C', 25), ('D:D', 30)):
+        worksheet.set_column(columns, width)
+    workbook.close()
+
+def workbook_parts(payload):
+    """Zip members of an .xlsx, minus document properties that carry a timestamp"""
+    import io
+    import zipfile
+
+    with zipfile.ZipFile(io.BytesIO(payload)) as archive:
+        return {name: archive.read(name) for name in archive.namelist() if name != 'docProps/core.xml'}
+
+def bench_skeleton(repeats=200):
+    """Per-template latency of the skeleton-based create_excel_template against the old path"""
+    import io
+    import logging
+    from app import create_excel_template, TEMPLATE_TYPES
+
+    logging.getLogger('app').setLevel(logging.WARNING)
+    data = make_generate_data(1)
+    print(f"🧪 Per-template latency, {len(data['works'])} works, mean of {repeats} runs")
+    print(f"   {'template':>12}  {'legacy':>9}  {'skeleton':>9}  {'change':>8}")
+    for template_type in TEMPLATE_TYPES:
+        outputs = {}
+        timings = {}
+        for name, build in (('legacy', legacy_create_template), ('skeleton', create_excel_template)):
+            start = time.perf_counter()
+            for _ in range(repeats):
+                buffer = io.BytesIO()
+                build(data, template_type, buffer)
+            timings[name] = (time.perf_counter() - start) / repeats
+            outputs[name] = workbook_parts(buffer.getvalue())
+        if outputs['legacy'] != outputs['skeleton']:
+            print(f"   ❌ {template_type} workbook differs from the legacy output")
+            return False
+        change = (timings['skeleton'] - timings['legacy']) / timings['legacy'] * 100
+        print(f"   {template_type:>12}  {timings['legacy'] * 1000:>7.2f}ms  {timings['skeleton'] * 1000:>7.2f}ms  {change:>+7.1f}%")
+    return True
+
+def current_rss_mb():
+    """Resident set size of this process in MB (Linux /proc, else peak RSS, else None)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        return None
+
+def bench_progress(tasks=1_000_000, checkpoints=5):
+    """Soak the ProgressTracker with a million parse-like tasks and watch memory stay flat"""
+    from app import ProgressTracker
+
+    tracker = ProgressTracker()
+    print(f"🧪 ProgressTracker soak: {tasks:,} tasks (max {tracker.max_tasks:,} tasks, {tracker.max_messages} messages each)")
+    print(f"   {'tasks':>10}  {'tracked':>8}  {'RSS':>9}  {'tasks/s':>9}")
+    start = time.perf_counter()
+    readings = []
+    for i in range(1, tasks + 1):
+        task_id = f"parse_{i:08x}"
+        tracker.start_task(task_id, 5)
+        for step in range(1, 6):
+            tracker.update_progress(task_id, step, f"Step {step} done")
+        tracker.complete_task(task_id, True)
+        if i % (tasks // checkpoints) == 0:
+            rss = current_rss_mb()
+            readings.append(rss)
+            rss_text = f"{rss:.0f} MB" if rss is not None else 'n/a'
+            print(f"   {i:>10,}  {len(tracker):>8,}  {rss_text:>9}  {i / (time.perf_counter() - start):>9,.0f}")
+    if len(tracker) > tracker.max_tasks:
+        print("   ❌ Tracker grew past max_tasks")
+        return False
+    if None not in readings and readings[-1] > readings[0] * 1.1:
+        print("   ❌ Memory kept growing after the tracker filled up")
+        return False
+    return True
+
+def make_bidder_database(count, seed=42):
+    """Build a synthetic bidder database dict with varied names, cities and last_used dates"""
+    import random
+    from datetime import datetime, timedelta
+
+    rng = random.Random(seed)
+    today = datetime.now()
+    bidders = {}
+    for i in range(count):
+        name = f"{rng.choice(BIDDER_FIRST_WORDS)} {rng.choice(BIDDER_TRADES)} {i}"
+        bidders[name] = {
+            'name': name,
+            'address': f"Ward {rng.randint(1, 60)}, {rng.choice(BIDDER_CITIES)}",
+            'last_used': (today - timedelta(days=rng.randint(0, 720))).strftime('%d/%m/%Y')
+        }
+    return bidders
+
+def make_bidder_manager(count):
+    """BidderManager loaded from a temporary synthetic database"""
+    import json
+    from bidder_manager import BidderManager
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'bidder_database.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(make_bidder_database(count), f)
+    return BidderManager(path), directory
+
+def legacy_search(bidders, query, limit=10):
+    """search_bidders as it was before the trigram index: a full scan per query"""
+    query = query.lower().strip()
+    results = []
+    for bidder_name, bidder_data in bidders.items():
+        name_match = query in bidder_name.lower()
+        address_match = query in bidder_data.get('address', '').lower()
+        if name_match or address_match:
+            results.append({'name': bidder_name, 'last_used': bidder_data.get('last_used', ''),
+                            'match_type': 'name' if name_match else 'address'})
+    results.sort(key=lambda x: (x['match_type'] != 'name', x['last_used']))
+    return results[:limit]
+
+def per_call_ms(func, *args, repeats=20):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func(*args)
+    return (time.perf_counter() - start) / repeats * 1000
+
+def bench_search():
+    """Indexed bidder search against the full scan, per query, at growing database sizes"""
+    print("🧪 Bidder search (ms per query)")
+    print(f"   {'bidders':>8}  {'query':<14}  {'scan':>8}  {'indexed':>8}  {'speedup':>8}")
+    for count in BIDDER_COUNTS:
+        manager, directory = make_bidder_manager(count)
+        try:
+            for query in SEARCH_QUERIES:
+                legacy_ms = per_call_ms(legacy_search, manager.bidders, query)
+                indexed_ms = per_call_ms(manager.search_bidders, query)
+                print(f"   {count:>8,}  {query:<14}  {legacy_ms:>8.3f}  {indexed_ms:>8.3f}  {legacy_ms / indexed_ms:>7.1f}x")
+        finally:
+            shutil.rmtree(directory)
+    return True
+
+def legacy_suggestions(bidders, partial_name, limit=5):
+    """get_bidder_suggestions as it was before the prefix index: startswith over every name"""
+    partial_name = partial_name.lower().strip()
+    return [name for name in bidders if name.lower().startswith(partial_name)][:limit]
+
+def bench_suggest():
+    """Prefix-indexed autocomplete against the full scan"""
+    print("🧪 Bidder suggestions (ms per keystroke)")
+    print(f"   {'bidders':>8}  {'prefix':<24}  {'scan':>8}  {'indexed':>8}")
+    for count in BIDDER_COUNTS:
+        manager, directory = make_bidder_manager(count)
+        try:
+            for prefix in SUGGEST_PREFIXES:
+                legacy_ms = per_call_ms(legacy_suggestions, manager.bidders, prefix)
+                indexed_ms = per_call_ms(manager.get_bidder_suggestions, prefix)
+                print(f"   {count:>8,}  {prefix:<24}  {legacy_ms:>8.3f}  {indexed_ms:>8.3f}")
+        finally:
+            shutil.rmtree(directory)
+    return True
+
+def legacy_recent_bidders(bidders, days=30):
+    """get_recent_bidders as it was before the recency index: parse every date on every call"""
+    from datetime import datetime
+
+    recent = []
+    current_date = datetime.now()
+    for bidder_name, bidder_data in bidders.items():
+        last_used_str = bidder_data.get('last_used', '')
+        if not last_used_str:
+            continue
+        last_used = None
+        for date_format in ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y']:
+            try:
+                last_used = datetime.strptime(last_used_str, date_format)
+                break
+            except ValueError:
+                continue
+        if last_used is None:
+            last_used = datetime.fromisoformat(last_used_str.replace('Z', '+00:00'))
+        days_diff = (current_date - last_used).days
+        if days_diff <= days:
+            recent.append({'name': bidder_name, 'last_used': last_used_str, 'days_ago': days_diff})
+    recent.sort(key=lambda x: x.get('days_ago', 999))
+    return recent[:20]
+
+def bench_index(count=INDEX_BIDDER_COUNT, requests=20):
+    """Recent-bidder lookups and the index route with a large bidder database"""
+    import app as app_module
+    import bidder_manager as bidder_manager_module
+
+    manager, directory = make_bidder_manager(count)
+    original_manager = bidder_manager_module._bidder_manager
+    bidder_manager_module._bidder_manager = manager
+    try:
+        print(f"🧪 Index route with {count:,} bidders")
+        legacy_ms = per_call_ms(legacy_recent_bidders, manager.bidders, 7, repeats=5)
+        indexed_ms = per_call_ms(manager.get_recent_bidders, 7)
+        print(f"   get_recent_bidders(7): {legacy_ms:.3f} ms parsing dates, {indexed_ms:.3f} ms indexed")
+
+        client = app_module.app.test_client()
+        client.get('/')  # template compile
+        timings = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = client.get('/')
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                print(f"   ❌ GET / returned {response.status_code}")
+                return False
+        timings.sort()
+        print(f"   GET /: p50 {timings[len(timings) // 2]:.2f} ms, max {timings[-1]:.2f} ms over {requests} requests")
+    finally:
+        bidder_manager_module._bidder_manager = original_manager
+        shutil.rmtree(directory)
+    return True
+
+def bench_responses(count=INDEX_BIDDER_COUNT, requests=20,
+                    paths=('/api/bidders/all', '/api/bidders/all?fields=name&limit=1000', '/api/bidders/popular',
+                           '/api/bidders/recent', '/api/bidders/stats')):
+    """Read-only bidder endpoints: rebuilt every time, served from the response cache, and revalidated to 304"""
+    import app as app_module
+    import bidder_manager as bidder_manager_module
+
+    manager, directory = make_bidder_manager(count)
+    original_manager = bidder_manager_module._bidder_manager
+    bidder_manager_module._bidder_manager = manager
+    client = app_module.app.test_client()
+
+    def median_ms(path, headers=None, clear=False):
+        timings = []
+        for _ in range(requests):
+            if clear:
+                app_module.response_cache.clear()
+            start = time.perf_counter()
+            client.get(path, headers=headers)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return timings[len(timings) // 2]
+
+    try:
+        print(f"🧪 Bidder API responses with {count:,} bidders (median ms per request)")
+        print(f"   {'endpoint':<40}  {'rebuilt':>9}  {'cached':>9}  {'304':>9}")
+        for path in paths:
+            etag = client.get(path).headers['ETag']
+            rebuilt = median_ms(path, clear=True)
+            cached = median_ms(path)
+            revalidated = median_ms(path, headers={'If-None-Match': etag})
+            print(f"   {path:<40}  {rebuilt:>9.2f}  {cached:>9.2f}  {revalidated:>9.2f}")
+    finally:
+        bidder_manager_module._bidder_manager = original_manager
+        app_module.response_cache.clear()
+        shutil.rmtree(directory)
+    return True
+
+STARTUP_PROBE = '''
+import sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get(sys.argv[1])
+assert response.status_code == 200, response.status_code
+print(imported - start, time.perf_counter() - imported)
+'''
+
+def bench_startup(runs=5, paths=('/api/bidders/stats', '/')):
+    """Cold import time and time to first response, each in a fresh interpreter"""
+    print(f"🧪 Cold start (median of {runs} fresh processes)")
+    print(f"   {'first request':<20}  {'import':>9}  {'request':>9}")
+    for path in paths:
+        imports, requests = [], []
+        for _ in range(runs):
+            output = subprocess.run([sys.executable, '-c', STARTUP_PROBE, path], capture_output=True, text=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)))
+            if output.returncode != 0:
+                print(f"   ❌ {path}: {output.stderr.strip().splitlines()[-1]}")
+                return False
+            import_time, request_time = map(float, output.stdout.split()[-2:])
+            imports.append(import_time * 1000)
+            requests.append(request_time * 1000)
+        imports.sort()
+        requests.sort()
+        print(f"   {path:<20}  {imports[runs // 2]:>6.1f} ms  {requests[runs // 2]:>6.1f} ms")
+    return True
+
+WARM_UP_PROBE = '''
+import io, sys, time, uuid
+start = time.perf_counter()
+import app
+ready = time.perf_counter()
+from sample_workbooks import SAMPLE_ROWS, write_sample_workbook
+nit_number = SAMPLE_ROWS[2][1]
+rows = [[f'{cell}-{uuid.uuid4().hex[:8]}' if cell == nit_number else cell for cell in row] for row in SAMPLE_ROWS]
+with open(write_sample_workbook(rows), 'rb') as f:
+    payload = f.read()
+request_start = time.perf_counter()
+response = app.app.test_client().post('/upload', data={'file': (io.BytesIO(payload), 'nit.xlsx')})
+assert response.status_code == 200, response.status_code
+print(ready - start, time.perf_counter() - request_start)
+'''
+
+def bench_warmup(runs=3):
+    """Time to ready and first /upload latency in fresh interpreters, with and without WARM_UP"""
+    print(f"🧪 First upload after start (median of {runs} fresh processes)")
+    print(f"   {'mode':<12}  {'ready':>9}  {'upload':>9}")
+    for label, warm in (('cold', '0'), ('WARM_UP=1', '1')):
+        readies, uploads = [], []
+        for _ in range(runs):
+            output = subprocess.run([sys.executable, '-c', WARM_UP_PROBE], capture_output=True, text=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)),
+                                    env=dict(os.environ, WARM_UP=warm))
+            if output.returncode != 0:
+                print(f"   ❌ {label}: {output.stderr.strip().splitlines()[-1]}")
+                return False
+            ready_time, upload_time = map(float, output.stdout.split()[-2:])
+            readies.append(ready_time * 1000)
+            uploads.append(upload_time * 1000)
+        readies.sort()
+        uploads.sort()
+        print(f"   {label:<12}  {readies[runs // 2]:>6.1f} ms  {uploads[runs // 2]:>6.1f} ms")
+    return True
+
+BENCHMARKS = {
+    'parse': bench_parse,
+    'backends': bench_backends,
+    'templates': bench_templates,
+    'skeleton': bench_skeleton,
+    'progress': bench_progress,
+    'search': bench_search,
+    'suggest': bench_suggest,
+    'index': bench_index,
+    'responses': bench_responses,
+    'startup': bench_startup,
+    'warmup': bench_warmup,
+}
+
+def main():
+    """Run the selected benchmarks (all by default)"""
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        print(f"❌ Unknown benchmark(s): {', '.join(unknown)}. Choose from: {', '.join(BENCHMARKS)}")
+        return False
+
+    print("🚀 Starting Tender Processing Application Benchmarks")
+    print("=" * 50)
+    ok = True
+    for name in selected:
+        ok = BENCHMARKS[name]() and ok
+        print()
+    return ok
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -4,168 +4,437 @@ Bidder Manager Module
 Handles bidder data retrieval, search, and management
 """
 
-import json
-import os
+import bisect
+import heapq
+import threading
+from collections import defaultdict
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 import logging
 
+from bidder_storage import city_from_address, open_store, parse_last_used
+
 logger = logging.getLogger(__name__)
 
+SEARCH_WALK_LIMIT = 1024  # recency entries scanned before falling back to intersecting postings
+
+# Fields a bidder listing can project; listings return BIDDER_DEFAULT_FIELDS unless asked otherwise
+BIDDER_FIELDS = ('name', 'address', 'last_used', 'usage_count')
+BIDDER_DEFAULT_FIELDS = ('name', 'address', 'last_used')
+
+def normalize_text(text: str) -> str:
+    """Lower-case and collapse whitespace for matching"""
+    return ' '.join(str(text or '').lower().split())
+
+class TrigramIndex:
+    """Inverted index from character trigrams to the keys whose text contains them
+    
+    Texts are indexed with a leading space, so ' ab' marks a word starting
+    with 'ab' and a query of ' ' + q finds word-start matches only.
+    """
+    
+    def __init__(self):
+        self.postings = defaultdict(set)  # trigram -> keys
+        self.grams = {}  # key -> trigrams, for removal
+    
+    @staticmethod
+    def trigrams(text: str) -> Set[str]:
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+    
+    def add(self, key: str, text: str):
+        """(Re)index key under the trigrams of text"""
+        self.remove(key)
+        grams = self.trigrams(f' {text}')
+        self.grams[key] = grams
+        for gram in grams:
+            self.postings[gram].add(key)
+    
+    def remove(self, key: str):
+        for gram in self.grams.pop(key, ()):
+            keys = self.postings[gram]
+            keys.discard(key)
+            if not keys:
+                del self.postings[gram]
+    
+    def postings_for(self, query: str) -> Optional[List[Set[str]]]:
+        """Posting sets for every trigram of query, smallest first, or None if query is too short
+        
+        Keys in all of them are a superset of the real matches and must be verified.
+        """
+        grams = self.trigrams(query)
+        if not grams:
+            return None
+        return sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+
 class BidderManager:
-    """Manages bidder data and provides search functionality"""
+    """Manages bidder data and provides search functionality
     
-    def __init__(self, database_path: str = "Attached_assets/Bidder_data/bidder_database.json"):
+    Safe to share one database between processes: updates run under the
+    store's advisory lock after picking up other processes' changes, and
+    reads first refresh() from a cheap change check on the store.
+    """
+    
+    def __init__(self, database_path: str = "Attached_assets/Bidder_data/bidder_database.json",
+                 storage: Optional[str] = None):
         self.database_path = database_path
+        self.store = open_store(database_path, storage)
+        self.lock = threading.RLock()
+        self.generation = 0  # bumped whenever the data read methods return may have changed
+        self.read_errors = 0  # read methods that failed and returned an empty fallback
         self.bidders = self.load_bidders()
-        self.recent_bidders = self.get_recent_bidders()
+        self.stored = {}  # name -> copy of the record as last loaded from or saved to storage
+        self._mark_stored(self.bidders)
+        self.build_indexes()
+    
+    def build_indexes(self):
+        """Rebuild the search, recency and location indexes from self.bidders"""
+        with self.lock:
+            self.generation += 1
+            self.name_index = TrigramIndex()
+            self.address_index = TrigramIndex()
+            self.search_text = {}  # name -> (normalized name, normalized address)
+            self.exact_names = defaultdict(set)  # normalized name -> names
+            self.last_used_at = {}  # name -> POSIX timestamp of last use, 0.0 if unknown
+            self.recency = []  # sorted (-last_used_at, name): most recent first, ties by name
+            self.undated = set()  # names whose last_used is set but could not be parsed
+            self.name_order = []  # sorted (normalized name, name) for prefix lookups
+            self.popularity = []  # sorted popularity keys: most used, then most recent first
+            self.popularity_keys = {}  # name -> its entry in self.popularity
+            self.cities = {}  # name -> normalized city
+            self.city_counts = {}  # city -> bidders
+            self.city_order = []  # sorted (-bidders, city): largest city first
+            # Append in one pass and sort once: insort per bidder would make the build quadratic
+            for bidder_name in self.bidders:
+                self._index_bidder(bidder_name, bulk=True)
+            self.name_order.sort()
+            self.recency.sort()
+            self.popularity.sort()
+            self.city_order = sorted((-count, city) for city, count in self.city_counts.items())
+    
+    def _index_bidder(self, name: str, bulk: bool = False):
+        # Caller holds self.lock. With bulk, sorted lists are appended to and left for build_indexes to sort
+        insert = list.append if bulk else bisect.insort
+        bidder_data = self.bidders[name]
+        name_text = normalize_text(name)
+        address_text = normalize_text(bidder_data.get('address', ''))
+        old_text = self.search_text.get(name)
+        if old_text is None or old_text[0] != name_text:
+            self.name_index.add(name, name_text)
+            self.exact_names[name_text].add(name)
+            insert(self.name_order, (name_text, name))
+        if old_text is None or old_text[1] != address_text:
+            self.address_index.add(name, address_text)
+        self.search_text[name] = (name_text, address_text)
+        
+        city = city_from_address(bidder_data.get('address', ''))
+        old_city = self.cities.get(name)
+        if old_city != city:
+            self._count_city(old_city, -1, bulk)
+            self._count_city(city, 1, bulk)
+            self.cities[name] = city
+        
+        last_used_text = bidder_data.get('last_used', '')
+        last_used = parse_last_used(last_used_text)
+        timestamp = last_used.timestamp() if last_used else 0.0
+        if last_used is None and last_used_text:
+            logger.warning(f"Could not parse date for {name}: {last_used_text}")
+            self.undated.add(name)
+        else:
+            self.undated.discard(name)
+        old_timestamp = self.last_used_at.get(name)
+        if old_timestamp != timestamp:
+            if old_timestamp is not None:
+                del self.recency[bisect.bisect_left(self.recency, (-old_timestamp, name))]
+            insert(self.recency, (-timestamp, name))
+            self.last_used_at[name] = timestamp
+        
+        popularity_key = (-bidder_data.get('usage_count', 0), -timestamp, name)
+        old_popularity_key = self.popularity_keys.get(name)
+        if old_popularity_key != popularity_key:
+            if old_popularity_key is not None:
+                del self.popularity[bisect.bisect_left(self.popularity, old_popularity_key)]
+            insert(self.popularity, popularity_key)
+            self.popularity_keys[name] = popularity_key
+    
+    def _count_city(self, city: Optional[str], delta: int, bulk: bool = False):
+        # Caller holds self.lock. With bulk, only the counts are kept; build_indexes sorts city_order
+        if not city:
+            return
+        count = self.city_counts.get(city, 0)
+        if bulk:
+            self.city_counts[city] = count + delta
+            return
+        if count:
+            del self.city_order[bisect.bisect_left(self.city_order, (-count, city))]
+        count += delta
+        if count:
+            self.city_counts[city] = count
+            bisect.insort(self.city_order, (-count, city))
+        else:
+            del self.city_counts[city]
+    
+    def refresh(self) -> bool:
+        """Apply changes other processes saved since our last load or save; True if there were any"""
+        with self.lock:
+            changes = self.store.changes()
+            if changes is None:
+                return False
+            complete, records = changes
+            if complete and not self.bidders.keys() <= records.keys():
+                # Bidders were removed outside the app: start over
+                self.bidders = records
+                self.stored = {}
+                self._mark_stored(records)
+                self.build_indexes()
+                return True
+            for name, record in records.items():
+                if self.bidders.get(name) != record:
+                    self.bidders[name] = record
+                    self._index_bidder(name)
+            self._mark_stored(records)
+            self.generation += 1
+            return True
+    
+    def _mark_stored(self, names: Iterable[str]):
+        # Caller holds self.lock (or is __init__). Records are flat, so a shallow copy is a snapshot
+        for name in names:
+            self.stored[name] = dict(self.bidders[name])
     
     def load_bidders(self) -> Dict:
-        """Load bidder data from JSON file"""
+        """Load bidder data from the storage backend"""
         try:
-            if os.path.exists(self.database_path):
-                with open(self.database_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            else:
-                logger.warning(f"Bidder database not found at {self.database_path}")
-                return {}
+            return self.store.load()
         except Exception as e:
             logger.error(f"Error loading bidder database: {e}")
             return {}
     
-    def get_recent_bidders(self, days: int = 30) -> List[Dict]:
-        """Get recently used bidders (within specified days)"""
+    def get_recent_bidders(self, days: int = 30, limit: int = 20) -> List[Dict]:
+        """Get recently used bidders (within specified days), most recent first
+        
+        Dates are parsed once when bidders are indexed, so this is a bisect on
+        the recency index plus a slice. Bidders whose last_used could not be
+        parsed follow with days_ago 999.
+        """
         try:
-            recent = []
-            current_date = datetime.now()
-            
-            for bidder_name, bidder_data in self.bidders.items():
-                last_used_str = bidder_data.get('last_used', '')
-                if last_used_str:
-                    try:
-                        # Handle different date formats
-                        last_used = None
-                        
-                        # Try different date formats
-                        date_formats = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y']
-                        for date_format in date_formats:
-                            try:
-                                last_used = datetime.strptime(last_used_str, date_format)
-                                break
-                            except ValueError:
-                                continue
-                        
-                        if last_used is None:
-                            # Try parsing ISO format
-                            last_used = datetime.fromisoformat(last_used_str.replace('Z', '+00:00'))
-                        
-                        if last_used:
-                            days_diff = (current_date - last_used).days
-                            if days_diff <= days:
-                                recent.append({
-                                    'name': bidder_name,
-                                    'address': bidder_data.get('address', ''),
-                                    'last_used': last_used_str,
-                                    'days_ago': days_diff
-                                })
-                    except Exception as date_error:
-                        logger.warning(f"Could not parse date for {bidder_name}: {last_used_str} - {date_error}")
-                        # Include bidder anyway with unknown date
-                        recent.append({
-                            'name': bidder_name,
-                            'address': bidder_data.get('address', ''),
-                            'last_used': last_used_str,
-                            'days_ago': 999
-                        })
-            
-            # Sort by most recent first (lowest days_ago)
-            recent.sort(key=lambda x: x.get('days_ago', 999))
-            return recent[:20]  # Return top 20 recent bidders
+            self.refresh()
+            now = datetime.now().timestamp()
+            with self.lock:
+                end = self._recent_count(days, now)
+                recent = [
+                    {
+                        'name': name,
+                        'address': self.bidders[name].get('address', ''),
+                        'last_used': self.bidders[name].get('last_used', ''),
+                        'days_ago': int((now + negative_timestamp) // 86400)
+                    }
+                    for negative_timestamp, name in self.recency[:min(end, limit)]
+                ]
+                for name in sorted(self.undated)[:limit - len(recent)]:
+                    recent.append({
+                        'name': name,
+                        'address': self.bidders[name].get('address', ''),
+                        'last_used': self.bidders[name].get('last_used', ''),
+                        'days_ago': 999
+                    })
+                return recent
             
         except Exception as e:
             logger.error(f"Error getting recent bidders: {e}")
+            self.read_errors += 1
             return []
     
+    def _recent_count(self, days: int, now: float) -> int:
+        """Number of bidders used within days, i.e. the length of that prefix of the recency index"""
+        # Caller holds self.lock; days_ago <= days means used less than days + 1 whole days ago
+        return bisect.bisect_left(self.recency, (-(now - (days + 1) * 86400),))
+    
     def update_bidder_usage(self, name: str, address: str = '') -> bool:
         """Update bidder usage timestamp"""
+        return self.update_bidders_usage([(name, address)])
+    
+    def update_bidders_usage(self, usages: Iterable[Tuple[str, str]]) -> bool:
+        """Record usage of many bidders with a single write to storage
+        
+        usages holds (name, address) pairs, e.g. every bidder of every work in
+        one /generate request. Repeated names collapse into one update that
+        keeps the last non-empty address; usage_count grows by every occurrence.
+        """
         try:
             current_date = datetime.now().strftime('%d/%m/%Y')
+            addresses = {}
+            counts = defaultdict(int)
+            for name, address in usages:
+                if address or name not in addresses:
+                    addresses[name] = address
+                counts[name] += 1
+            if not addresses:
+                return True
             
-            if name in self.bidders:
-                self.bidders[name]['last_used'] = current_date
-                if address:
-                    self.bidders[name]['address'] = address
-            else:
-                # Add new bidder
-                self.bidders[name] = {
-                    'name': name,
-                    'address': address,
-                    'last_used': current_date
-                }
-            
-            # Save to file
-            self.save_bidders()
-            return True
+            with self.lock, self.store.locked():
+                # Another process may have written since we last looked
+                self.refresh()
+                for name, address in addresses.items():
+                    if name in self.bidders:
+                        self.bidders[name]['last_used'] = current_date
+                        if address:
+                            self.bidders[name]['address'] = address
+                    else:
+                        # Add new bidder
+                        self.bidders[name] = {
+                            'name': name,
+                            'address': address,
+                            'last_used': current_date
+                        }
+                    self.bidders[name]['usage_count'] = self.bidders[name].get('usage_count', 0) + counts[name]
+                    self._index_bidder(name)
+                self.generation += 1
+                
+                # Save to storage
+                self.store.save(self.bidders, list(addresses))
+                self._mark_stored(addresses)
+                return True
             
         except Exception as e:
             logger.error(f"Error updating bidder usage: {e}")
             return False
     
-    def save_bidders(self) -> bool:
-        """Save bidder data to JSON file"""
+    def save_bidders(self, changed: Optional[List[str]] = None) -> bool:
+        """Persist in-memory edits to the bidders named in changed
+        
+        With changed=None, the edited bidders are found by comparing each record
+        with its copy from the last load or save. Like update_bidders_usage, this
+        first picks up what other processes saved, under the store lock: the
+        edited records then replace theirs and every other bidder keeps its
+        stored version.
+        """
         try:
-            os.makedirs(os.path.dirname(self.database_path), exist_ok=True)
-            with open(self.database_path, 'w', encoding='utf-8') as f:
-                json.dump(self.bidders, f, indent=2, ensure_ascii=False)
+            with self.lock, self.store.locked():
+                if changed is None:
+                    names = [name for name, record in self.bidders.items() if self.stored.get(name) != record]
+                else:
+                    names = [name for name in changed if name in self.bidders]
+                edits = {name: dict(self.bidders[name]) for name in names}
+                self.refresh()
+                for name, record in edits.items():
+                    # Reindex even if unchanged here: the caller may have edited the record in place
+                    self.bidders[name] = record
+                    self._index_bidder(name)
+                self.generation += 1
+                self.store.save(self.bidders, names)
+                self._mark_stored(names)
             return True
         except Exception as e:
             logger.error(f"Error saving bidder database: {e}")
             return False
     
     def search_bidders(self, query: str, limit: int = 10) -> List[Dict]:
-        """Search bidders by name or address"""
+        """Search bidders by name or address
+        
+        Results are ranked by match quality (exact name, word in name, anywhere
+        in name, word in address, anywhere in address), then most recent use.
+        """
         try:
-            query = query.lower().strip()
-            if not query:
+            query = normalize_text(query)
+            if not query or limit <= 0:
                 return []
             
-            results = []
-            for bidder_name, bidder_data in self.bidders.items():
-                name_match = query in bidder_name.lower()
-                address_match = query in bidder_data.get('address', '').lower()
+            self.refresh()
+            with self.lock:
+                word_query = f' {query}'
+                tiers = [
+                    ('name', self.name_index, word_query, lambda text: word_query in f' {text[0]}'),
+                    ('name', self.name_index, query, lambda text: query in text[0]),
+                    ('address', self.address_index, word_query, lambda text: word_query in f' {text[1]}'),
+                    ('address', self.address_index, query, lambda text: query in text[1]),
+                ]
+                matches = [(name, 'name') for name in sorted(self.exact_names.get(query, ()),
+                                                             key=lambda name: (-self.last_used_at[name], name))]
+                seen = {name for name, _ in matches}
+                for match_type, index, tier_query, verify in tiers:
+                    if len(matches) >= limit:
+                        break
+                    for bidder_name in self._most_recent(index.postings_for(tier_query), verify,
+                                                         limit - len(matches), seen):
+                        matches.append((bidder_name, match_type))
+                        seen.add(bidder_name)
                 
-                if name_match or address_match:
-                    results.append({
+                return [
+                    {
                         'name': bidder_name,
-                        'address': bidder_data.get('address', ''),
-                        'last_used': bidder_data.get('last_used', ''),
-                        'match_type': 'name' if name_match else 'address'
-                    })
-            
-            # Sort by relevance (name matches first, then by last used date)
-            results.sort(key=lambda x: (x['match_type'] != 'name', x['last_used']))
-            return results[:limit]
+                        'address': self.bidders[bidder_name].get('address', ''),
+                        'last_used': self.bidders[bidder_name].get('last_used', ''),
+                        'match_type': match_type
+                    }
+                    for bidder_name, match_type in matches[:limit]
+                ]
             
         except Exception as e:
             logger.error(f"Error searching bidders: {e}")
+            self.read_errors += 1
             return []
     
+    def _most_recent(self, postings: Optional[List[Set[str]]], verify: Callable, count: int,
+                     exclude: Set[str]) -> List[str]:
+        """Up to count verified matches, most recently used first
+        
+        Small posting sets are intersected, verified and sorted directly. With
+        large ones (or none, meaning every bidder) the recency index is walked
+        from the newest entry and stops as soon as count matches are found; if
+        matches turn out to be sparse the walk gives up after SEARCH_WALK_LIMIT
+        entries and falls back to the intersection.
+        """
+        # Caller holds self.lock
+        if postings is None or len(postings[0]) ** 2 > count * len(self.recency):
+            smallest, others = (postings[0], postings[1:]) if postings is not None else (None, ())
+            found = []
+            for steps, (_, name) in enumerate(self.recency):
+                if smallest is not None:
+                    if steps == SEARCH_WALK_LIMIT:
+                        break
+                    if name not in smallest or not all(name in keys for keys in others):
+                        continue
+                if name not in exclude and verify(self.search_text[name]):
+                    found.append(name)
+                    if len(found) == count:
+                        return found
+            else:
+                return found
+        
+        candidates = postings[0].intersection(*postings[1:])
+        found = [name for name in candidates if name not in exclude and verify(self.search_text[name])]
+        found.sort(key=lambda name: (-self.last_used_at[name], name))
+        return found[:count]
+    
     def get_bidder_by_name(self, name: str) -> Optional[Dict]:
         """Get specific bidder by exact name"""
         try:
+            self.refresh()
             return self.bidders.get(name, None)
         except Exception as e:
             logger.error(f"Error getting bidder by name: {e}")
+            self.read_errors += 1
             return None
     
     def get_popular_bidders(self, limit: int = 10) -> List[Dict]:
-        """Get most frequently used bidders"""
+        """Get most frequently used bidders, most recent first among equal counts
+        
+        Reads the head of the popularity order, which update_bidders_usage keeps sorted.
+        """
         try:
-            # For now, return recent bidders as popular ones
-            # In a real implementation, you'd track usage frequency
-            return self.recent_bidders[:limit]
+            self.refresh()
+            with self.lock:
+                return [
+                    {
+                        'name': name,
+                        'address': self.bidders[name].get('address', ''),
+                        'last_used': self.bidders[name].get('last_used', ''),
+                        'usage_count': -negative_count
+                    }
+                    for negative_count, _, name in self.popularity[:max(limit, 0)]
+                ]
         except Exception as e:
             logger.error(f"Error getting popular bidders: {e}")
+            self.read_errors += 1
             return []
     
     def get_bidders_by_location(self, location: str) -> List[Dict]:
@@ -174,7 +443,8 @@ class BidderManager:
             location = location.lower().strip()
             results = []
             
-            for bidder_name, bidder_data in self.bidders.items():
+            self.refresh()
+            for bidder_name, bidder_data in list(self.bidders.items()):
                 address = bidder_data.get('address', '').lower()
                 if location in address:
                     results.append({
@@ -187,65 +457,118 @@ class BidderManager:
             
         except Exception as e:
             logger.error(f"Error getting bidders by location: {e}")
+            self.read_errors += 1
             return []
     
-    def get_all_bidders(self) -> List[Dict]:
-        """Get all bidders sorted by name"""
+    def get_all_bidders(self, fields: Iterable[str] = BIDDER_DEFAULT_FIELDS) -> List[Dict]:
+        """Get all bidders sorted by name (case-insensitive); prefer get_bidders_page for large databases"""
         try:
-            return [
-                {
-                    'name': name,
-                    'address': data.get('address', ''),
-                    'last_used': data.get('last_used', '')
-                }
-                for name, data in sorted(self.bidders.items())
-            ]
+            self.refresh()
+            with self.lock:
+                return [self._project(name, fields) for _, name in self.name_order]
         except Exception as e:
             logger.error(f"Error getting all bidders: {e}")
+            self.read_errors += 1
             return []
     
+    def get_bidders_page(self, after: Optional[str] = None, limit: int = 100,
+                         fields: Iterable[str] = BIDDER_DEFAULT_FIELDS) -> Tuple[List[Dict], Optional[str]]:
+        """One page of bidders in name order, starting after the bidder named after
+        
+        Bisects the sorted name index, so a page costs the same whatever the
+        database size. Returns the page and the name to pass as after for the
+        next one (None on the last page). The position holds even if that
+        bidder has since been removed.
+        """
+        self.refresh()
+        with self.lock:
+            start = 0 if after is None else bisect.bisect_right(self.name_order, (normalize_text(after), after))
+            entries = self.name_order[start:start + max(limit, 0)]
+            page = [self._project(name, fields) for _, name in entries]
+            more = start + len(entries) < len(self.name_order)
+            return page, (entries[-1][1] if entries and more else None)
+    
+    def _project(self, name: str, fields: Iterable[str]) -> Dict:
+        # Caller holds self.lock
+        bidder_data = self.bidders[name]
+        return {
+            field: name if field == 'name' else bidder_data.get(field, 0 if field == 'usage_count' else '')
+            for field in fields
+        }
+    
     def get_bidder_suggestions(self, partial_name: str, limit: int = 5) -> List[str]:
-        """Get bidder name suggestions for autocomplete"""
+        """Get bidder name suggestions for autocomplete
+        
+        Names starting with partial_name (case-insensitive) are found by bisecting
+        the sorted name index and ranked by usage count, then most recent use.
+        Short prefixes matching many names walk the popularity order instead.
+        Raises ValueError for a negative limit.
+        """
+        if limit < 0:
+            raise ValueError(f"limit must not be negative (got {limit})")
         try:
-            partial_name = partial_name.lower().strip()
-            if not partial_name:
+            prefix = normalize_text(partial_name)
+            if not prefix:
                 return []
             
-            suggestions = []
-            for bidder_name in self.bidders.keys():
-                if bidder_name.lower().startswith(partial_name):
-                    suggestions.append(bidder_name)
-            
-            return suggestions[:limit]
+            self.refresh()
+            with self.lock:
+                start = bisect.bisect_left(self.name_order, (prefix,))
+                end = bisect.bisect_left(self.name_order, (prefix[:-1] + chr(ord(prefix[-1]) + 1),))
+                if (end - start) ** 2 <= limit * len(self.name_order):
+                    return heapq.nsmallest(limit, (name for _, name in self.name_order[start:end]),
+                                           key=self.popularity_keys.__getitem__)
+                
+                # Many matches: walk from the most popular bidder, they turn up quickly
+                suggestions = []
+                for _, _, name in self.popularity:
+                    if len(suggestions) == limit:
+                        break
+                    if self.search_text[name][0].startswith(prefix):
+                        suggestions.append(name)
+                return suggestions
             
         except Exception as e:
             logger.error(f"Error getting bidder suggestions: {e}")
+            self.read_errors += 1
             return []
     
-    def get_bidder_stats(self) -> Dict:
-        """Get bidder database statistics"""
+    def get_bidder_stats(self, recent_days: int = 30) -> Dict:
+        """Get bidder database statistics
+        
+        Totals and the city histogram are maintained as bidders are indexed,
+        so this reads counters instead of scanning the database.
+        """
         try:
-            total_bidders = len(self.bidders)
-            recent_count = len(self.recent_bidders)
-            
-            # Count by location
-            locations = {}
-            for bidder_data in self.bidders.values():
-                address = bidder_data.get('address', '')
-                if address:
-                    # Extract city from address (simple approach)
-                    city = address.split(',')[-1].strip() if ',' in address else address
-                    locations[city] = locations.get(city, 0) + 1
-            
-            return {
-                'total_bidders': total_bidders,
-                'recent_bidders': recent_count,
-                'top_locations': dict(sorted(locations.items(), key=lambda x: x[1], reverse=True)[:5])
-            }
+            self.refresh()
+            now = datetime.now().timestamp()
+            with self.lock:
+                return {
+                    'total_bidders': len(self.bidders),
+                    'recent_bidders': self._recent_count(recent_days, now),
+                    'top_locations': {city: -negative_count for negative_count, city in self.city_order[:5]}
+                }
             
         except Exception as e:
             logger.error(f"Error getting bidder stats: {e}")
+            self.read_errors += 1
             return {}
 
-# Global bidder manager instance
-bidder_manager = BidderManager()
+# Global bidder manager instance, loaded on first use
+_bidder_manager = None
+_bidder_manager_lock = threading.Lock()
+
+def get_bidder_manager() -> BidderManager:
+    """Return the shared BidderManager, loading the bidder database on first use"""
+    global _bidder_manager
+    if _bidder_manager is None:
+        with _bidder_manager_lock:
+            if _bidder_manager is None:
+                _bidder_manager = BidderManager()
+    return _bidder_manager
+
+def __getattr__(name):
+    # Keeps 'from bidder_manager import bidder_manager' working
+    if name == 'bidder_manager':
+        return get_bidder_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Bidder Storage Module
+Persistence backends for the bidder database: the original JSON file, or
+SQLite (WAL mode) with indexed name, city and last_used columns. Several
+processes can share one database: writers serialize on an advisory lock
+file and readers cheaply detect what other processes changed.
+"""
+
+import functools
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+BIDDER_STORAGE_BACKENDS = ('json', 'sqlite')
+BIDDER_STORAGE = os.environ.get('BIDDER_STORAGE', 'json')
+
+DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y')
+
+@functools.lru_cache(maxsize=4096)  # Many bidders share a date; strptime dominated index builds
+def parse_last_used(value: str) -> Optional[datetime]:
+    """Parse a last_used string in any of the formats found in the database"""
+    if not value:
+        return None
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+def city_from_address(address: str) -> str:
+    """Normalized city of an address: the text after the last comma (or the whole address), title-cased"""
+    return ' '.join(address.split(',')[-1].split()).title()
+
+def _lock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    f.seek(0)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # gives up after about 10 seconds
+            return
+        except OSError:
+            continue
+
+def _unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+@contextmanager
+def file_lock(lock_path: str):
+    """Exclusive advisory lock on lock_path, shared by every process that uses it (not re-entrant)"""
+    os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+    with open(lock_path, 'a+b') as f:
+        _lock_file(f)
+        try:
+            yield
+        finally:
+            _unlock_file(f)
+
+class BidderStore(ABC):
+    """Loads and persists the bidder dict (name -> record)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+
+    def locked(self):
+        """Exclusive advisory lock shared by every process using this database (not re-entrant)"""
+        return file_lock(self.lock_path)
+
+    @abstractmethod
+    def load(self) -> Dict:
+        """Every record in storage"""
+
+    @abstractmethod
+    def changes(self) -> Optional[Tuple[bool, Dict]]:
+        """What other processes saved since this store last loaded or saved
+
+        Returns None if nothing changed, else (complete, records): every record
+        when complete is True, otherwise only the changed ones.
+        """
+
+    @abstractmethod
+    def save(self, bidders: Dict, changed: Optional[Iterable[str]] = None):
+        """Persist bidders; changed names the records that differ from storage (None: all of them)"""
+
+    def close(self):
+        pass
+
+class JsonBidderStore(BidderStore):
+    """The whole database as one indented JSON file, atomically rewritten on every save
+
+    Every save renames a new file into place, so (inode, mtime, size) of the
+    path identifies a version and one stat() tells whether it changed.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.version = None
+
+    @staticmethod
+    def _version(stat_result) -> Tuple:
+        return (stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size)
+
+    def load(self) -> Dict:
+        if not os.path.exists(self.path):
+            logger.warning(f"Bidder database not found at {self.path}")
+            self.version = None
+            return {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            self.version = self._version(os.fstat(f.fileno()))
+            return json.load(f)
+
+    def changes(self) -> Optional[Tuple[bool, Dict]]:
+        try:
+            version = self._version(os.stat(self.path))
+        except FileNotFoundError:
+            return None
+        if version == self.version:
+            return None
+        return True, self.load()
+
+    def save(self, bidders: Dict, changed: Optional[Iterable[str]] = None):
+        """Write the whole file to a temporary name and rename it into place"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(bidders, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.version = self._version(os.stat(self.path))
+
+class SqliteBidderStore(BidderStore):
+    """One row per bidder in an SQLite database in WAL mode
+
+    Saves only upsert the changed rows. On first run (no bidders table yet) the
+    JSON database at import_path, if any, is imported in a single transaction.
+    Fields beyond name, address and last_used are kept in an 'extra' JSON column.
+    The derived name_key, city and last_used_at columns are for ad-hoc queries;
+    the app queries its in-memory indexes, so they are not indexed.
+
+    Each save bumps a generation counter and stamps the rows it wrote with it,
+    so changes() fetches only rows newer than the generation last seen, and
+    only after PRAGMA data_version reports a commit from another connection.
+    """
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS bidders (
+            name TEXT PRIMARY KEY,
+            name_key TEXT NOT NULL,
+            address TEXT NOT NULL DEFAULT '',
+            city TEXT NOT NULL DEFAULT '',
+            last_used TEXT NOT NULL DEFAULT '',
+            last_used_at REAL NOT NULL DEFAULT 0,
+            extra TEXT NOT NULL DEFAULT '{}',
+            generation INTEGER NOT NULL DEFAULT 0
+        )""",
+        "CREATE INDEX IF NOT EXISTS bidders_generation ON bidders (generation)",
+        # Indexes older versions created but nothing queries; they only slowed down upserts
+        "DROP INDEX IF EXISTS bidders_name_key",
+        "DROP INDEX IF EXISTS bidders_city",
+        "DROP INDEX IF EXISTS bidders_last_used_at",
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0)",
+    )
+    CORE_FIELDS = ('name', 'address', 'last_used')
+
+    def __init__(self, path: str, import_path: Optional[str] = None):
+        import sqlite3
+
+        super().__init__(path)
+        self.import_path = import_path
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.data_version = None
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute('PRAGMA busy_timeout=10000')
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        with self.locked(), self.lock:
+            first_run = self.connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bidders'"
+            ).fetchone() is None
+            if not first_run:
+                columns = [row[1] for row in self.connection.execute('PRAGMA table_info(bidders)')]
+                if 'generation' not in columns:
+                    self.connection.execute('ALTER TABLE bidders ADD COLUMN generation INTEGER NOT NULL DEFAULT 0')
+            for statement in self.SCHEMA:
+                self.connection.execute(statement)
+            if first_run and import_path and os.path.exists(import_path):
+                bidders = JsonBidderStore(import_path).load()
+                self._save(bidders, bidders.keys())
+                logger.info(f"Imported {len(bidders)} bidders from {import_path} into {path}")
+
+    def load(self) -> Dict:
+        with self.lock:
+            self.connection.execute('BEGIN')
+            try:
+                rows = self.connection.execute('SELECT name, address, last_used, extra FROM bidders').fetchall()
+                self.generation = self._read_generation()
+                self.data_version = self._read_data_version()
+            finally:
+                self.connection.execute('COMMIT')
+        return self._records(rows)
+
+    def changes(self) -> Optional[Tuple[bool, Dict]]:
+        with self.lock:
+            data_version = self._read_data_version()
+            if data_version == self.data_version:
+                return None
+            self.connection.execute('BEGIN')
+            try:
+                generation = self._read_generation()
+                rows = self.connection.execute(
+                    'SELECT name, address, last_used, extra FROM bidders WHERE generation > ?', (self.generation,)
+                ).fetchall() if generation != self.generation else []
+                self.data_version = self._read_data_version()
+            finally:
+                self.connection.execute('COMMIT')
+            self.generation = generation
+        return (False, self._records(rows)) if rows else None
+
+    def save(self, bidders: Dict, changed: Optional[Iterable[str]] = None):
+        with self.lock:
+            self._save(bidders, bidders.keys() if changed is None else changed)
+
+    def _save(self, bidders: Dict, names: Iterable[str]):
+        # Caller holds self.lock
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            generation = self._read_generation() + 1
+            self.connection.executemany(
+                """INSERT INTO bidders (name, name_key, address, city, last_used, last_used_at, extra, generation)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (name) DO UPDATE SET
+                       name_key = excluded.name_key, address = excluded.address, city = excluded.city,
+                       last_used = excluded.last_used, last_used_at = excluded.last_used_at,
+                       extra = excluded.extra, generation = excluded.generation""",
+                [self._row(name, bidders[name]) + (generation,) for name in names]
+            )
+            self.connection.execute("UPDATE meta SET value = ? WHERE key = 'generation'", (generation,))
+            self.connection.execute('COMMIT')
+        except Exception:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.generation = generation
+
+    def _read_generation(self) -> int:
+        return self.connection.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+
+    def _read_data_version(self) -> int:
+        return self.connection.execute('PRAGMA data_version').fetchone()[0]
+
+    @staticmethod
+    def _records(rows) -> Dict:
+        bidders = {}
+        for name, address, last_used, extra in rows:
+            bidders[name] = dict(json.loads(extra), name=name, address=address, last_used=last_used)
+        return bidders
+
+    def _row(self, name: str, record: Dict) -> tuple:
+        address = record.get('address', '') or ''
+        last_used = record.get('last_used', '') or ''
+        parsed = parse_last_used(last_used)
+        extra = {key: value for key, value in record.items() if key not in self.CORE_FIELDS}
+        return (name, name.lower(), address, city_from_address(address), last_used,
+                parsed.timestamp() if parsed else 0.0, json.dumps(extra, ensure_ascii=False))
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+def open_store(database_path: str, backend: Optional[str] = None) -> BidderStore:
+    """Store for the bidder database at database_path (a .json path)
+
+    backend is 'json' or 'sqlite' (see BIDDER_STORAGE_BACKENDS); defaults to
+    BIDDER_STORAGE. The SQLite database sits next to the JSON file and imports it once.
+    """
+    backend = backend or BIDDER_STORAGE
+    if backend not in BIDDER_STORAGE_BACKENDS:
+        raise ValueError(f"Unknown bidder storage: {backend} (choose from: {', '.join(BIDDER_STORAGE_BACKENDS)})")
+    if backend == 'sqlite':
+        return SqliteBidderStore(f"{os.path.splitext(database_path)[0]}.sqlite3", import_path=database_path)
+    return JsonBidderStore(database_path)
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Pytest configuration
+Points the app's analytics files and output folder (generated bundles and
+shared job state) at temporary directories so test runs never touch
+analytics.json or leave files in the repository
+"""
+
+import os
+import shutil
+import tempfile
+
+ANALYTICS_DIR = tempfile.mkdtemp(prefix='tender-analytics-')
+os.environ['ANALYTICS_FILE'] = os.path.join(ANALYTICS_DIR, 'analytics.json')
+OUTPUT_DIR = tempfile.mkdtemp(prefix='tender-outputs-')
+os.environ['OUTPUT_FOLDER'] = OUTPUT_DIR
+
+def pytest_sessionfinish(session, exitstatus):
+    import sys
+
+    app = sys.modules.get('app')
+    if app is not None and app._analytics is not None:
+        app._analytics.close()
+    shutil.rmtree(ANALYTICS_DIR, ignore_errors=True)
+    shutil.rmtree(OUTPUT_DIR, ignore_errors=True)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Metrics Module
+Fixed-memory latency histograms that can be merged across worker processes,
+and rendering in the Prometheus text exposition format
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (HDR style)
+
+    Values between min_value and max_value seconds fall into buckets that grow
+    by 2**(1/buckets_per_octave), so any percentile is within about 2% of the
+    true value while memory stays fixed. Values outside the range are clamped
+    into the first or last bucket; min and max are tracked exactly.
+    """
+
+    MIN_VALUE = 1e-6   # 1 microsecond
+    MAX_VALUE = 3600.0  # 1 hour
+    BUCKETS_PER_OCTAVE = 16
+
+    def __init__(self):
+        self.bucket_count = int(math.ceil(math.log2(self.MAX_VALUE / self.MIN_VALUE) * self.BUCKETS_PER_OCTAVE)) + 1
+        self.counts = [0] * self.bucket_count
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _bucket(self, value: float) -> int:
+        if value <= self.MIN_VALUE:
+            return 0
+        index = int(math.log2(value / self.MIN_VALUE) * self.BUCKETS_PER_OCTAVE)
+        return min(index, self.bucket_count - 1)
+
+    def _bucket_value(self, index: int) -> float:
+        """Geometric midpoint of a bucket"""
+        return self.MIN_VALUE * 2 ** ((index + 0.5) / self.BUCKETS_PER_OCTAVE)
+
+    def record(self, value: float):
+        value = max(float(value), 0.0)
+        self.counts[self._bucket(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Approximate q-th percentile (0-100), clamped to the observed min and max"""
+        if not self.count:
+            return None
+        rank = max(1, int(math.ceil(q / 100.0 * self.count)))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(max(self._bucket_value(index), self.min), self.max)
+        return self.max
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Add another histogram's samples into this one"""
+        for index, bucket_count in enumerate(other.counts):
+            if bucket_count:
+                self.counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'mean': round(self.total / self.count, 6) if self.count else None,
+            'p50': self._rounded(self.percentile(50)),
+            'p90': self._rounded(self.percentile(90)),
+            'p99': self._rounded(self.percentile(99)),
+            'max': self._rounded(self.max)
+        }
+
+    @staticmethod
+    def _rounded(value):
+        return round(value, 6) if value is not None else None
+
+    def to_dict(self) -> Dict:
+        """Sparse, JSON-friendly form for persistence and cross-process merging"""
+        return {
+            'counts': {str(index): bucket_count for index, bucket_count in enumerate(self.counts) if bucket_count},
+            'count': self.count,
+            'sum': self.total,
+            'min': self.min,
+            'max': self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LatencyHistogram':
+        histogram = cls()
+        for index, bucket_count in data.get('counts', {}).items():
+            histogram.counts[min(int(index), histogram.bucket_count - 1)] += bucket_count
+        histogram.count = data.get('count', 0)
+        histogram.total = data.get('sum', 0.0)
+        histogram.min = data.get('min')
+        histogram.max = data.get('max')
+        return histogram
+
+class LatencyRecorder:
+    """Thread-safe set of named histograms, grouped by kind ('routes', 'stages')"""
+
+    def __init__(self):
+        self.histograms = {}  # (kind, name) -> LatencyHistogram
+        self.lock = threading.Lock()
+        self.version = 0
+
+    def record(self, kind: str, name: str, seconds: float):
+        with self.lock:
+            histogram = self.histograms.get((kind, name))
+            if histogram is None:
+                histogram = self.histograms[(kind, name)] = LatencyHistogram()
+            histogram.record(seconds)
+            self.version += 1
+
+    @contextmanager
+    def time(self, name: str, kind: str = 'stages'):
+        """Context manager recording the wall time of its block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(kind, name, time.perf_counter() - start)
+
+    def to_dict(self) -> Dict:
+        with self.lock:
+            result = {}
+            for (kind, name), histogram in self.histograms.items():
+                result.setdefault(kind, {})[name] = histogram.to_dict()
+            return result
+
+    def clear(self):
+        """Drop every histogram, e.g. once they have been accounted for elsewhere"""
+        with self.lock:
+            self.histograms.clear()
+            self.version += 1
+
+    def summary(self, others: Iterable[Dict] = ()) -> Dict:
+        """Percentile summary of this recorder merged with serialized recorders from other processes"""
+        return {
+            kind: {name: histogram.summary() for name, histogram in sorted(histograms.items())}
+            for kind, histograms in _merge_histograms([self.to_dict(), *others]).items()
+        }
+
+    def save(self, path: str):
+        """Atomically write this recorder's histograms to path"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+def _merge_histograms(recorders: Iterable[Dict]) -> Dict[str, Dict[str, LatencyHistogram]]:
+    merged = {}
+    for data in recorders:
+        for kind, histograms in data.items():
+            for name, histogram_data in histograms.items():
+                histogram = LatencyHistogram.from_dict(histogram_data)
+                if name in merged.setdefault(kind, {}):
+                    merged[kind][name].merge(histogram)
+                else:
+                    merged[kind][name] = histogram
+    return merged
+
+def merge_recorders(recorders: Iterable[Dict]) -> Dict:
+    """Combine serialized recorders into one, in the form save() writes"""
+    return {
+        kind: {name: histogram.to_dict() for name, histogram in histograms.items()}
+        for kind, histograms in _merge_histograms(recorders).items()
+    }
+
+def process_alive(pid: int) -> bool:
+    """Whether a process with this PID exists (always True where that cannot be checked cheaply)"""
+    if os.name == 'nt':
+        return True  # os.kill would terminate it; callers fall back on file age
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists, owned by another user
+    return True
+
+def load_recorders(paths: Iterable[str]) -> list:
+    """Read serialized recorders written by save(), skipping unreadable files"""
+    recorders = []
+    for path in paths:
+        try:
+            with open(path) as f:
+                recorders.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping latency file {path}: {e}")
+    return recorders
+
+# Prometheus text exposition format (version 0.0.4)
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+SUMMARY_QUANTILES = (('0.5', 'p50'), ('0.9', 'p90'), ('0.99', 'p99'))
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_value(value) -> str:
+    if value is None:
+        return 'NaN'
+    if isinstance(value, float):
+        return 'NaN' if math.isnan(value) else repr(value)
+    return str(int(value))
+
+def render_prometheus(families: Iterable[Tuple[str, str, str, List[Tuple[str, Dict, float]]]]) -> str:
+    """Render metric families as exposition text
+
+    Each family is (name, type, help, samples) and each sample is
+    (suffix, labels, value); suffix is '' or e.g. '_sum' / '_count'.
+    """
+    lines = []
+    for name, metric_type, help_text, samples in families:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for suffix, labels, value in samples:
+            label_text = ','.join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+            sample_name = f"{name}{suffix}{{{label_text}}}" if label_text else f"{name}{suffix}"
+            lines.append(f"{sample_name} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
+
+def summary_family(name: str, help_text: str, label: str, summaries: Dict[str, Dict]) -> Tuple:
+    """Turn LatencyRecorder summaries into a Prometheus summary family (quantiles, _sum, _count)"""
+    samples = []
+    for key, summary in summaries.items():
+        for quantile, field in SUMMARY_QUANTILES:
+            samples.append(('', {label: key, 'quantile': quantile}, summary[field]))
+        samples.append(('_sum', {label: key}, float(summary['sum'])))
+        samples.append(('_count', {label: key}, summary['count']))
+    return (name, 'summary', help_text, samples)
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Sample Workbooks Module
+Small NIT workbooks built on the fly, shared by the tests and benchmarks
+"""
+
+import os
+import tempfile
+
+SAMPLE_ROWS = [
+    ['OFFICE OF THE EXECUTIVE ENGINEER', None, None],
+    ['NIT Number', None, None],
+    [None, 'NIT/03/2025-26', None],
+    ['S.No.', 'Description', 'Amount'],
+    [1, 'Work 1 - Street lighting', 125000],
+    [None, 'Supply of fittings', 500],
+    [2, '  WORK 2 - Pump house  ', 98000.5],
+    [None, 'Work without number', None],
+]
+
+def write_sample_workbook(rows=SAMPLE_ROWS):
+    """Write rows to a temporary .xlsx file and return its path"""
+    import openpyxl
+
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    for row in rows:
+        worksheet.append(row)
+    handle, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(handle)
+    workbook.save(path)
+    return path
@@ -63,9 +63,19 @@ def main():
     
     # Import and run the Flask app
     try:
-        from app import app
+        from app import app, warm_up, WARM_UP
         
         print("✅ Flask application loaded successfully")
+        
+        # Opt-in: pay the first-request costs before serving (--warm-up; with WARM_UP=1 the import already did)
+        if WARM_UP:
+            print("✅ Warmed up at import")
+        elif '--warm-up' in sys.argv[1:]:
+            print("🔥 Warming up...")
+            start = time.perf_counter()
+            warm_up()
+            print(f"✅ Warm-up done in {time.perf_counter() - start:.1f}s")
+        
         print("🌐 Starting web server...")
         print("📱 The application will open in your browser automatically")
         print("🔗 Manual access: http://localhost:5000")
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Test script for analytics persistence
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import Analytics
+from metrics import LatencyHistogram, LatencyRecorder, render_prometheus, summary_family
+
+def make_analytics(directory, **kwargs):
+    """Analytics instance writing into directory, with the background flusher effectively idle"""
+    kwargs.setdefault('flush_interval', 3600)
+    return Analytics(stats_file=os.path.join(directory, 'analytics.json'), **kwargs)
+
+def test_record_is_write_behind_and_replayed():
+    """Recording only touches memory; flushed events are appended to the log and replayed on load"""
+    directory = tempfile.mkdtemp()
+    try:
+        analytics = make_analytics(directory)
+        analytics.record_upload('a.xlsx', 'xlsx', True)
+        analytics.record_upload('b.xlsx', 'xlsx', False)
+        assert not os.path.exists(analytics.log_file)
+
+        analytics.flush()
+        with open(analytics.log_file) as f:
+            assert len(f.readlines()) == 3  # header and two events
+        assert not os.path.exists(analytics.stats_file)
+
+        reloaded = make_analytics(directory)
+        stats = reloaded.snapshot()
+        assert (stats['total_uploads'], stats['successful_generations'], stats['errors']) == (2, 1, 1)
+        assert stats['file_types'] == {'xlsx': 2}
+        analytics.close()
+    finally:
+        shutil.rmtree(directory)
+
+def test_compaction_never_double_counts():
+    """After compaction the log holds no events, and a stale log left by a crash is not replayed twice"""
+    directory = tempfile.mkdtemp()
+    try:
+        analytics = make_analytics(directory, compact_every=3)
+        for _ in range(2):
+            analytics.record_upload('a.xlsx', 'xlsx')
+        analytics.flush()
+        with open(analytics.log_file) as f:
+            stale_log = f.read()
+        analytics.record_upload('a.xlsx', 'xlsx')
+        analytics.flush()
+        with open(analytics.log_file) as f:
+            assert len(f.readlines()) == 1
+        with open(analytics.stats_file) as f:
+            assert json.load(f)['total_uploads'] == 3
+        analytics.close()
+
+        # Crash between the snapshot rename and the log replacement
+        with open(analytics.log_file, 'w') as f:
+            f.write(stale_log + '{"file_type": "xl')
+        assert make_analytics(directory).snapshot()['total_uploads'] == 3
+
+        # A torn line in the current log does not swallow the next append
+        analytics = make_analytics(directory)
+        analytics.record_upload('a.xlsx', 'xlsx')
+        analytics.flush()
+        with open(analytics.log_file, 'a') as f:
+            f.write('{"file_type": "xl')
+        analytics.record_upload('b.xls', 'xls')
+        analytics.flush()
+        assert make_analytics(directory).snapshot()['file_types'] == {'xlsx': 4, 'xls': 1}
+    finally:
+        shutil.rmtree(directory)
+
+def test_instances_sharing_a_file_keep_every_event():
+    """Two processes' Analytics on one stats file neither skip nor drop each other's events"""
+    directory = tempfile.mkdtemp()
+    try:
+        first, second = make_analytics(directory), make_analytics(directory)
+        for _ in range(5):
+            first.record_upload('a.xlsx', 'xlsx')
+        for _ in range(3):
+            second.record_upload('b.xls', 'xls', False)
+        first.flush()
+        second.flush()
+        assert make_analytics(directory).snapshot()['total_uploads'] == 8
+        assert second.snapshot()['total_uploads'] == 8  # flushing picks up the other process's events
+
+        first.close()
+        second.record_upload('b.xls', 'xls')
+        second.close()
+        with open(second.stats_file) as f:
+            stats = json.load(f)
+        assert (stats['total_uploads'], stats['errors'], stats['file_types']) == (9, 3, {'xlsx': 5, 'xls': 4})
+    finally:
+        shutil.rmtree(directory)
+
+ANALYTICS_PROCESSES = 4
+ANALYTICS_EVENTS = 60
+
+def analytics_worker(directory):
+    """Record and flush events, compacting often enough to interleave with the other processes"""
+    analytics = make_analytics(directory, compact_every=7)
+    for n in range(ANALYTICS_EVENTS):
+        analytics.record_upload('a.xlsx', 'xlsx')
+        if n % 5 == 0:
+            analytics.flush()
+    analytics.close()
+
+def test_concurrent_processes_keep_every_event():
+    """Processes flushing and compacting one stats file at the same time lose no events"""
+    import multiprocessing
+
+    directory = tempfile.mkdtemp()
+    try:
+        processes = [multiprocessing.Process(target=analytics_worker, args=(directory,))
+                     for _ in range(ANALYTICS_PROCESSES)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+            assert process.exitcode == 0
+        assert make_analytics(directory).snapshot()['total_uploads'] == ANALYTICS_PROCESSES * ANALYTICS_EVENTS
+    finally:
+        shutil.rmtree(directory)
+
+def test_concurrent_records_survive_close():
+    """Concurrent recorders lose nothing across a clean shutdown"""
+    directory = tempfile.mkdtemp()
+    try:
+        analytics = make_analytics(directory, flush_interval=0.01, compact_every=250)
+
+        def record():
+            for _ in range(500):
+                analytics.record_upload('a.xlsx', 'xlsx', True)
+
+        threads = [threading.Thread(target=record) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        analytics.close()
+
+        assert make_analytics(directory).snapshot()['total_uploads'] == 4000
+    finally:
+        shutil.rmtree(directory)
+
+def test_histogram_percentiles_and_merge():
+    """Percentiles stay within the bucket error and merged histograms equal one built from all samples"""
+    samples = [i / 1000.0 for i in range(1, 1001)]  # 1ms .. 1s
+    histogram = LatencyHistogram()
+    for value in samples:
+        histogram.record(value)
+    for q, expected in ((50, 0.5), (90, 0.9), (99, 0.99)):
+        assert abs(histogram.percentile(q) - expected) / expected < 0.03, q
+    assert histogram.summary()['max'] == 1.0 and histogram.count == 1000
+
+    first, second = LatencyHistogram(), LatencyHistogram()
+    for value in samples[::2]:
+        first.record(value)
+    for value in samples[1::2]:
+        second.record(value)
+    first.merge(LatencyHistogram.from_dict(second.to_dict()))
+    assert first.counts == histogram.counts
+    assert first.summary() == histogram.summary()
+
+def test_latency_summary_merges_worker_files():
+    """latency_summary combines this process's histograms with those saved by other live workers"""
+    directory = tempfile.mkdtemp()
+    try:
+        analytics = make_analytics(directory)
+        analytics.latency.record('routes', '/upload', 0.2)
+
+        other_worker = make_analytics(directory)
+        other_worker.latency.record('routes', '/upload', 0.4)
+        other_worker.latency.save(os.path.join(directory, f'analytics.json.latency-{os.getppid()}-0a1b2c3d.json'))
+
+        summary = analytics.latency_summary()
+        assert summary['routes']['/upload']['count'] == 2
+        assert summary['routes']['/upload']['max'] == 0.4
+    finally:
+        shutil.rmtree(directory)
+
+def test_latency_files_of_gone_workers_are_retired():
+    """Files of exited or long-silent workers, and a worker's own file on close(), fold into the retired totals once"""
+    import subprocess
+
+    directory = tempfile.mkdtemp()
+    try:
+        exited = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'],
+                                capture_output=True, text=True).stdout.strip()
+        other = LatencyRecorder()
+        other.record('routes', '/upload', 0.4)
+        dead_path = os.path.join(directory, f'analytics.json.latency-{exited}-0a1b2c3d.json')
+        silent_path = os.path.join(directory, f'analytics.json.latency-{os.getppid()}-0a1b2c3d.json')
+        other.save(dead_path)
+        other.save(silent_path)
+        os.utime(silent_path, (0, 0))
+
+        analytics = make_analytics(directory)
+        assert analytics.latency_summary()['routes']['/upload']['count'] == 2
+        assert not os.path.exists(dead_path) and not os.path.exists(silent_path)
+        assert analytics.latency_summary()['routes']['/upload']['count'] == 2
+
+        analytics.latency.record('routes', '/upload', 0.2)
+        analytics.flush()
+        own_path = analytics._latency_path()
+        assert os.path.exists(own_path)
+        analytics.close()
+        assert not os.path.exists(own_path)
+
+        # Counts never drop when a worker goes away
+        summary = make_analytics(directory).latency_summary()['routes']['/upload']
+        assert summary['count'] == 3 and summary['max'] == 0.4
+
+        # A worker whose file was retired while it stalled starts over instead of counting its samples twice
+        analytics = make_analytics(directory)
+        analytics.latency.record('routes', '/upload', 0.1)
+        analytics.flush()
+        os.utime(analytics._latency_path(), (0, 0))
+        assert make_analytics(directory).latency_summary()['routes']['/upload']['count'] == 4
+        analytics.flush()
+        analytics.latency.record('routes', '/upload', 0.1)
+        analytics.flush()
+        assert make_analytics(directory).latency_summary()['routes']['/upload']['count'] == 5
+    finally:
+        shutil.rmtree(directory)
+
+def test_prometheus_exposition():
+    """Summaries render as quantile, _sum and _count samples with escaped labels"""
+    recorder = LatencyRecorder()
+    for seconds in (0.1, 0.2, 0.3):
+        recorder.record('routes', '/upload', seconds)
+    family = summary_family('tender_http_request_duration_seconds', 'Request latency', 'route',
+                            recorder.summary()['routes'])
+    text = render_prometheus([family, ('tender_bidders', 'gauge', 'Bidders', [('', {'note': 'a"b'}, 7)])])
+    lines = text.splitlines()
+
+    assert '# TYPE tender_http_request_duration_seconds summary' in lines
+    assert 'tender_http_request_duration_seconds_count{route="/upload"} 3' in lines
+    assert any(line.startswith('tender_http_request_duration_seconds_sum{route="/upload"} 0.6') for line in lines)
+    median = next(line for line in lines
+                  if line.startswith('tender_http_request_duration_seconds{route="/upload",quantile="0.5"} '))
+    assert abs(float(median.split()[-1]) - 0.2) < 0.01
+    assert 'tender_bidders{note="a\\"b"} 7' in lines
+
+if __name__ == "__main__":
+    for test in (test_record_is_write_behind_and_replayed, test_compaction_never_double_counts,
+                 test_instances_sharing_a_file_keep_every_event, test_concurrent_processes_keep_every_event,
+                 test_concurrent_records_survive_close, test_histogram_percentiles_and_merge,
+                 test_latency_summary_merges_worker_files, test_latency_files_of_gone_workers_are_retired,
+                 test_prometheus_exposition):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Test script for the bidder manager: search ranking and incremental indexes
+"""
+
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bidder_manager import BidderManager, normalize_text, parse_last_used
+from bidder_storage import BidderStore, SqliteBidderStore, city_from_address
+
+SAMPLE_BIDDERS = {
+    'Arun Electricals': {'name': 'Arun Electricals', 'address': 'Fatehpuria Bazar, Pali', 'last_used': '19/07/2025'},
+    'Electric House': {'name': 'Electric House', 'address': 'Jaipur', 'last_used': '01/01/2024'},
+    'Shree Electric Works': {'name': 'Shree Electric Works', 'address': 'Udaipur', 'last_used': '2025-08-01'},
+    'Bhawani Air Systems': {'name': 'Bhawani Air Systems', 'address': 'Electricity Colony, Jaipur', 'last_used': '20/07/2025'},
+    'Ashapura Traders': {'name': 'Ashapura Traders', 'address': 'UDAIPUR', 'last_used': '15/03/2025'},
+}
+
+def make_manager(bidders, storage='json'):
+    """BidderManager over a temporary copy of bidders; returns it with its directory"""
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'bidder_database.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(bidders, f)
+    return BidderManager(path, storage=storage), directory
+
+def reference_search(bidders, query, limit=10):
+    """Rank every bidder by match quality then recency, without any index"""
+    query = normalize_text(query)
+    ranked = []
+    for name, data in bidders.items():
+        name_text, address_text = normalize_text(name), normalize_text(data.get('address', ''))
+        tiers = [name_text == query, f' {query}' in f' {name_text}', query in name_text,
+                 f' {query}' in f' {address_text}', query in address_text]
+        if any(tiers):
+            last_used = parse_last_used(data.get('last_used', ''))
+            ranked.append((tiers.index(True), -(last_used.timestamp() if last_used else 0.0), name))
+    ranked.sort()
+    return [name for _, _, name in ranked[:limit]]
+
+def make_random_bidders(count, seed=7):
+    """Bidders with overlapping names, shared cities and many same-day last_used dates"""
+    rng = random.Random(seed)
+    words = ['Arun', 'Shree', 'Ganesh', 'Electric', 'Works', 'Builders', 'Air', 'Systems', 'Traders']
+    cities = ['Jaipur', 'Udaipur', 'Pali', 'Kota']
+    bidders = {}
+    for i in range(count):
+        name = f"{rng.choice(words)} {rng.choice(words)} {i}"
+        bidders[name] = {'name': name, 'address': f"Ward {i % 40}, {rng.choice(cities)}",
+                         'last_used': f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.choice([2024, 2025])}",
+                         'usage_count': rng.randint(0, 3)}
+    return bidders
+
+def test_search_ranks_by_match_quality_then_recency():
+    """Exact and word matches beat substrings, name beats address, recent beats old"""
+    manager, directory = make_manager(SAMPLE_BIDDERS)
+    try:
+        results = manager.search_bidders('electric')
+        assert [r['name'] for r in results] == [
+            'Shree Electric Works', 'Arun Electricals', 'Electric House', 'Bhawani Air Systems'
+        ]
+        assert [r['match_type'] for r in results] == ['name', 'name', 'name', 'address']
+        assert manager.search_bidders('electric house')[0]['name'] == 'Electric House'
+        assert [r['name'] for r in manager.search_bidders('ctric')][:3] == [
+            'Shree Electric Works', 'Arun Electricals', 'Electric House'
+        ]
+        assert [r['name'] for r in manager.search_bidders('udaipur')] == ['Shree Electric Works', 'Ashapura Traders']
+        assert [r['name'] for r in manager.search_bidders('sha')] == ['Ashapura Traders']
+        assert manager.search_bidders('  ') == [] and manager.search_bidders('zzq') == []
+    finally:
+        shutil.rmtree(directory)
+
+def test_search_matches_full_scan():
+    """Indexed search returns exactly what a full scan ranks first, for long and short queries"""
+    bidders = make_random_bidders(3000)
+    manager, directory = make_manager(bidders)
+    try:
+        for query in ['electric', 'sha', 'ar', 'e', 'ward 3', 'jaipur', 'works 12', 'ks bu', 'nothing']:
+            expected = reference_search(bidders, query)
+            assert [r['name'] for r in manager.search_bidders(query)] == expected, query
+    finally:
+        shutil.rmtree(directory)
+
+def test_usage_updates_keep_indexes_current():
+    """New bidders and changed addresses are searchable straight away and move to the front"""
+    manager, directory = make_manager(SAMPLE_BIDDERS)
+    try:
+        manager.update_bidder_usage('Navkar Electric', 'Kota')
+        assert manager.search_bidders('electric')[0]['name'] == 'Navkar Electric'
+
+        manager.update_bidder_usage('Electric House', 'Bikaner')
+        assert manager.search_bidders('bikaner')[0]['name'] == 'Electric House'
+        assert manager.search_bidders('jaipur')[0]['name'] == 'Bhawani Air Systems'
+        assert manager.search_bidders('electric')[0]['name'] in ('Navkar Electric', 'Electric House')
+        assert len(manager.recency) == len(manager.bidders) == 6
+    finally:
+        shutil.rmtree(directory)
+
+def test_suggestions_use_prefix_index():
+    """Suggestions are case-insensitive prefix matches, most used then most recent first"""
+    bidders = dict(SAMPLE_BIDDERS)
+    bidders['electric house annexe'] = {'name': 'electric house annexe', 'address': '', 'last_used': '',
+                                        'usage_count': 3}
+    manager, directory = make_manager(bidders)
+    try:
+        assert manager.get_bidder_suggestions('ELEC') == ['electric house annexe', 'Electric House']
+        assert manager.get_bidder_suggestions('a') == ['Arun Electricals', 'Ashapura Traders']
+        assert manager.get_bidder_suggestions('a', limit=1) == ['Arun Electricals']
+        assert manager.get_bidder_suggestions('electricity') == []
+        assert manager.get_bidder_suggestions(' ') == []
+        assert manager.get_bidder_suggestions('a', limit=0) == []
+        try:
+            manager.get_bidder_suggestions('a', limit=-1)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Expected ValueError for a negative limit")
+
+        import app
+        assert app.app.test_client().get('/api/bidders/suggestions?q=a&limit=-1').status_code == 400
+
+        manager.update_bidder_usage('Electra Power', 'Kota')
+        assert manager.get_bidder_suggestions('elec') == ['electric house annexe', 'Electra Power', 'Electric House']
+    finally:
+        shutil.rmtree(directory)
+
+    bidders = make_random_bidders(3000)
+    manager, directory = make_manager(bidders)
+    try:
+        for prefix in ['a', 'sh', 'electric w', 'works air 12', 'x']:
+            expected = sorted(
+                (name for name in bidders if name.lower().startswith(prefix)),
+                key=lambda name: (-bidders[name]['usage_count'], -parse_last_used(bidders[name]['last_used']).timestamp(), name)
+            )[:5]
+            assert manager.get_bidder_suggestions(prefix) == expected, prefix
+    finally:
+        shutil.rmtree(directory)
+
+def test_batched_usage_is_one_write():
+    """A batch of usages collapses duplicates and writes storage once"""
+    manager, directory = make_manager(SAMPLE_BIDDERS)
+    try:
+        writes = []
+        save = manager.store.save
+        manager.store.save = lambda bidders, changed=None: (writes.append(sorted(changed)), save(bidders, changed))
+        usages = [('Navkar Electric', 'Kota'), ('Electric House', ''), ('Navkar Electric', ''),
+                  ('Electric House', 'Bikaner')] * 20
+        assert manager.update_bidders_usage(usages)
+        assert writes == [['Electric House', 'Navkar Electric']]
+
+        with open(manager.database_path, encoding='utf-8') as f:
+            saved = json.load(f)
+        assert saved['Navkar Electric']['address'] == 'Kota'
+        assert saved['Electric House']['address'] == 'Bikaner'
+        assert not os.path.exists(f"{manager.database_path}.tmp")
+        assert manager.update_bidders_usage([]) and len(writes) == 1
+    finally:
+        shutil.rmtree(directory)
+
+def test_popular_bidders_follow_usage():
+    """Popular bidders are ranked by usage count, then recency, and update immediately"""
+    manager, directory = make_manager(SAMPLE_BIDDERS)
+    try:
+        assert [b['name'] for b in manager.get_popular_bidders(2)] == ['Shree Electric Works', 'Bhawani Air Systems']
+
+        manager.update_bidders_usage([('Ashapura Traders', ''), ('Electric House', ''), ('Ashapura Traders', '')])
+        manager.update_bidder_usage('Electric House')
+        popular = manager.get_popular_bidders(3)
+        assert [(b['name'], b['usage_count']) for b in popular] == [
+            ('Ashapura Traders', 2), ('Electric House', 2), ('Shree Electric Works', 0)
+        ]
+        assert manager.bidders['Ashapura Traders']['usage_count'] == 2
+        assert manager.get_popular_bidders(0) == []
+    finally:
+        shutil.rmtree(directory)
+
+def test_recent_bidders_use_recency_index():
+    """Recent bidders come from the recency index with the same day arithmetic as before"""
+    today = datetime.now()
+    bidders = {
+        name: {'name': name, 'address': '', 'last_used': last_used}
+        for name, last_used in [
+            ('Today', today.strftime('%d/%m/%Y')),
+            ('Thirty', (today - timedelta(days=30)).strftime('%Y-%m-%d')),
+            ('ThirtyOne', (today - timedelta(days=31)).strftime('%d/%m/%Y')),
+            ('Five', (today - timedelta(days=5)).strftime('%d-%m-%Y')),
+            ('Garbled', 'next week'),
+            ('Never', ''),
+        ]
+    }
+    manager, directory = make_manager(bidders)
+    try:
+        recent = manager.get_recent_bidders(30)
+        assert [(b['name'], b['days_ago']) for b in recent] == [('Today', 0), ('Five', 5), ('Thirty', 30), ('Garbled', 999)]
+        assert [b['name'] for b in manager.get_recent_bidders(7)] == ['Today', 'Five', 'Garbled']
+        assert [b['name'] for b in manager.get_recent_bidders(30, limit=2)] == ['Today', 'Five']
+
+        manager.update_bidder_usage('ThirtyOne')
+        manager.update_bidder_usage('Garbled')
+        assert [b['name'] for b in manager.get_recent_bidders(0)] == ['Garbled', 'ThirtyOne', 'Today']
+    finally:
+        shutil.rmtree(directory)
+
+def test_stats_are_maintained_incrementally():
+    """Stats match a full recount after concurrent updates, with cities normalized once"""
+    manager, directory = make_manager(SAMPLE_BIDDERS)
+    try:
+        stats = manager.get_bidder_stats()
+        assert stats['total_bidders'] == 5
+        assert stats['top_locations'] == {'Udaipur': 2, 'Jaipur': 2, 'Pali': 1}
+
+        def record(worker):
+            for n in range(50):
+                manager.update_bidders_usage([(f'Worker {worker} Bidder {n}', f'Shop {n}, {["Kota", "kota ", "Ajmer"][n % 3]}'),
+                                              ('Electric House', ['Bikaner', 'Jaipur'][n % 2])])
+
+        threads = [threading.Thread(target=record, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        cities = {}
+        for data in manager.bidders.values():
+            city = city_from_address(data['address'])
+            cities[city] = cities.get(city, 0) + 1
+        stats = manager.get_bidder_stats()
+        assert stats['total_bidders'] == 205
+        assert stats['top_locations'] == dict(sorted(cities.items(), key=lambda item: (-item[1], item[0]))[:5])
+        assert stats['top_locations']['Kota'] == 136
+        assert stats['recent_bidders'] == len(manager.get_recent_bidders(30, limit=len(manager.bidders))) >= 201
+    finally:
+        shutil.rmtree(directory)
+
+def test_bulk_index_build_matches_incremental_indexing():
+    """build_indexes sorts once at the end and ends up with the same indexes as inserting bidders one at a time"""
+    bidders = make_random_bidders(500)
+    bidders['Bad Date Co'] = {'name': 'Bad Date Co', 'address': 'Kota', 'last_used': 'someday'}
+    manager, directory = make_manager(bidders)
+    try:
+        incremental, other_directory = make_manager({})
+        try:
+            with incremental.lock:
+                incremental.bidders = dict(bidders)
+                for name in bidders:
+                    incremental._index_bidder(name)
+            for attribute in ('name_order', 'recency', 'popularity', 'popularity_keys', 'city_counts', 'city_order',
+                              'undated', 'last_used_at'):
+                assert getattr(manager, attribute) == getattr(incremental, attribute), attribute
+        finally:
+            shutil.rmtree(other_directory)
+    finally:
+        shutil.rmtree(directory)
+
+def test_sqlite_storage_imports_json_and_upserts():
+    """The SQLite backend imports the JSON file once, then persists single-bidder updates"""
+    bidders = dict(SAMPLE_BIDDERS)
+    bidders['Arun Electricals'] = dict(bidders['Arun Electricals'], usage_count=2)
+    manager, directory = make_manager(bidders, storage='sqlite')
+    try:
+        assert manager.bidders == bidders
+        assert [r['name'] for r in manager.search_bidders('electric')][:2] == ['Shree Electric Works', 'Arun Electricals']
+
+        manager.update_bidder_usage('Navkar Electric', 'Station Road, Kota')
+        manager.store.close()
+        os.remove(manager.database_path)  # imported already, must not be needed again
+
+        reloaded = BidderManager(manager.database_path, storage='sqlite')
+        assert reloaded.bidders['Navkar Electric']['address'] == 'Station Road, Kota'
+        assert reloaded.bidders['Arun Electricals']['usage_count'] == 2
+        city, = reloaded.store.connection.execute(
+            "SELECT city FROM bidders WHERE name = 'Navkar Electric'").fetchone()
+        assert city == 'Kota'
+        assert reloaded.store.connection.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        # Only the index changes() queries is kept; ones an older version created are dropped
+        reloaded.store.connection.execute('CREATE INDEX bidders_city ON bidders (city COLLATE NOCASE)')
+        reloaded.store.close()
+        assert isinstance(reloaded.store, SqliteBidderStore)
+        store = SqliteBidderStore(reloaded.store.path)
+        indexes = [row[0] for row in store.connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'bidders' AND sql IS NOT NULL")]
+        assert indexes == ['bidders_generation']
+        store.close()
+
+        try:
+            BidderStore(manager.database_path)
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("BidderStore is abstract")
+    finally:
+        shutil.rmtree(directory)
+
+def test_save_bidders_keeps_other_processes_updates():
+    """Saving local edits first picks up what another process saved, so neither side's changes are lost"""
+    for storage in ('json', 'sqlite'):
+        manager, directory = make_manager(SAMPLE_BIDDERS, storage=storage)
+        try:
+            other = BidderManager(manager.database_path, storage=storage)
+            other.update_bidder_usage('Other Process Co', 'Kota')
+            other.update_bidder_usage('Electric House')
+
+            manager.bidders['Arun Electricals']['address'] = 'Sector 4, Bhilwara'
+            assert manager.save_bidders(['Arun Electricals'])
+            assert manager.search_bidders('bhilwara')[0]['name'] == 'Arun Electricals'
+
+            # Without names, only records edited since the last load or save are written
+            other.update_bidder_usage('Ashapura Traders', 'Hiran Magri, Udaipur')
+            manager.bidders['Electric House']['address'] = 'MI Road, Jaipur'
+            assert manager.save_bidders()
+            assert manager.bidders['Ashapura Traders']['address'] == 'Hiran Magri, Udaipur', storage
+
+            reloaded = BidderManager(manager.database_path, storage=storage)
+            assert reloaded.bidders['Arun Electricals']['address'] == 'Sector 4, Bhilwara', storage
+            assert 'Other Process Co' in reloaded.bidders, storage
+            assert reloaded.bidders['Electric House']['usage_count'] == \
+                SAMPLE_BIDDERS['Electric House'].get('usage_count', 0) + 1, storage
+            assert reloaded.bidders['Electric House']['address'] == 'MI Road, Jaipur', storage
+            assert reloaded.bidders['Ashapura Traders']['address'] == 'Hiran Magri, Udaipur', storage
+            assert reloaded.bidders['Ashapura Traders']['usage_count'] == 1, storage
+            for opened in (manager, other, reloaded):
+                opened.store.close()
+        finally:
+            shutil.rmtree(directory)
+
+def test_app_import_defers_singletons():
+    """Importing app loads neither the bidder database nor analytics; first use does, once"""
+    probe = (
+        "import threading, app, bidder_manager\n"
+        "assert bidder_manager._bidder_manager is None and app._analytics is None\n"
+        "managers = []\n"
+        "threads = [threading.Thread(target=lambda: managers.append(bidder_manager.get_bidder_manager()))"
+        " for _ in range(8)]\n"
+        "[thread.start() for thread in threads]; [thread.join() for thread in threads]\n"
+        "assert len(set(map(id, managers))) == 1 and bidder_manager.bidder_manager is managers[0]\n"
+        "assert app.app.test_client().get('/api/bidders/stats').status_code == 200\n"
+        "assert app._analytics is not None\n"
+    )
+    result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.returncode == 0, result.stderr
+
+STRESS_PROCESSES = 4
+STRESS_UPDATES = 40
+
+def stress_worker(database_path, storage, worker):
+    """Record usage of one shared and one private bidder per update"""
+    manager = BidderManager(database_path, storage=storage)
+    for n in range(STRESS_UPDATES):
+        assert manager.update_bidders_usage([('Shared Bidder', ''), (f'Worker {worker} Bidder {n}', 'Kota')])
+        manager.search_bidders('bidder')
+
+def test_bidder_api_serves_cached_responses_with_etags():
+    """Unchanged data is served from the response cache and revalidates to 304; any update changes the ETag"""
+    import app
+    import bidder_manager
+
+    manager, directory = make_manager(SAMPLE_BIDDERS)
+    previous, bidder_manager._bidder_manager = bidder_manager._bidder_manager, manager
+    app.response_cache.clear()
+    try:
+        client = app.app.test_client()
+        first = client.get('/api/bidders/all')
+        assert first.status_code == 200 and first.headers['ETag']
+        assert [bidder['name'] for bidder in first.get_json()['bidders']] == sorted(SAMPLE_BIDDERS)
+        hits = app.response_cache.stats()['hits']
+        assert client.get('/api/bidders/all').data == first.data
+        assert app.response_cache.stats()['hits'] == hits + 1
+
+        etag = first.headers['ETag']
+        assert client.get('/api/bidders/all', headers={'If-None-Match': etag}).status_code == 304
+        assert client.get('/api/bidders/popular?limit=2').headers['ETag'] != etag
+
+        # An update from this process, then one saved by another process
+        manager.update_bidder_usage('New Works Co', 'Ajmer')
+        second = client.get('/api/bidders/all', headers={'If-None-Match': etag})
+        assert second.status_code == 200 and 'New Works Co' in second.get_data(as_text=True)
+        BidderManager(manager.database_path).update_bidder_usage('Other Process Co', 'Kota')
+        third = client.get('/api/bidders/all', headers={'If-None-Match': second.headers['ETag']})
+        assert third.status_code == 200 and 'Other Process Co' in third.get_data(as_text=True)
+    finally:
+        bidder_manager._bidder_manager = previous
+        app.response_cache.clear()
+        shutil.rmtree(directory)
+
+def test_bidder_api_does_not_cache_failed_reads():
+    """A read that failed and fell back to an empty payload is served without an ETag and rebuilt next time"""
+    import app
+    import bidder_manager
+
+    manager, directory = make_manager(SAMPLE_BIDDERS)
+    previous, bidder_manager._bidder_manager = bidder_manager._bidder_manager, manager
+    app.response_cache.clear()
+    try:
+        client = app.app.test_client()
+        city_order, manager.city_order = manager.city_order, None
+        failed = client.get('/api/bidders/stats')
+        assert failed.status_code == 200 and failed.get_json() == {} and 'ETag' not in failed.headers
+        assert manager.read_errors == 1 and app.response_cache.stats()['entries'] == 0
+
+        manager.city_order = city_order
+        recovered = client.get('/api/bidders/stats')
+        assert recovered.status_code == 200 and recovered.headers['ETag']
+        assert recovered.get_json()['total_bidders'] == len(SAMPLE_BIDDERS)
+        assert app.response_cache.stats()['entries'] == 1
+    finally:
+        bidder_manager._bidder_manager = previous
+        app.response_cache.clear()
+        shutil.rmtree(directory)
+
+def test_metrics_count_bidders_saved_by_other_processes():
+    """tender_bidders picks up bidders another worker saved since this one last read the database"""
+    import app
+    import bidder_manager
+
+    manager, directory = make_manager(SAMPLE_BIDDERS)
+    previous, bidder_manager._bidder_manager = bidder_manager._bidder_manager, manager
+    try:
+        BidderManager(manager.database_path).update_bidder_usage('Other Process Co', 'Kota')
+        lines = app.app.test_client().get('/metrics').get_data(as_text=True).splitlines()
+        assert f'tender_bidders {len(SAMPLE_BIDDERS) + 1}' in lines
+    finally:
+        bidder_manager._bidder_manager = previous
+        shutil.rmtree(directory)
+
+def test_bidder_pages_cover_every_bidder_once():
+    """Cursor pages walk the name index in order, survive concurrent inserts and project fields; NDJSON streams all"""
+    import app
+    import bidder_manager
+
+    bidders = make_random_bidders(250)
+    manager, directory = make_manager(bidders)
+    previous, bidder_manager._bidder_manager = bidder_manager._bidder_manager, manager
+    app.response_cache.clear()
+    try:
+        client = app.app.test_client()
+        names, cursor = [], None
+        while True:
+            query = '/api/bidders/all?limit=40&fields=name' + (f'&cursor={cursor}' if cursor else '')
+            body = client.get(query).get_json()
+            assert all(list(bidder) == ['name'] for bidder in body['bidders'])
+            names.extend(bidder['name'] for bidder in body['bidders'])
+            cursor = body['next_cursor']
+            if len(names) == 40:
+                manager.update_bidder_usage('aaa First Co')  # sorts before the cursor: not seen
+                manager.update_bidder_usage('zzz Last Co')  # sorts after it: seen
+            if cursor is None:
+                break
+        expected = sorted([*bidders, 'zzz Last Co'], key=lambda name: (normalize_text(name), name))
+        assert names == expected
+
+        page, after = manager.get_bidders_page(limit=2, fields=('name', 'usage_count'))
+        assert after == page[-1]['name'] and set(page[0]) == {'name', 'usage_count'}
+
+        export = client.get('/api/bidders/all?format=ndjson')
+        assert export.mimetype == 'application/x-ndjson'
+        lines = [json.loads(line) for line in export.get_data(as_text=True).splitlines()]
+        assert [line['name'] for line in lines] == [name for _, name in manager.name_order]
+        assert set(lines[0]) == {'name', 'address', 'last_used'}
+
+        assert client.get('/api/bidders/all?fields=name,secret').status_code == 400
+        assert client.get('/api/bidders/all?cursor=%%%').status_code == 400
+    finally:
+        bidder_manager._bidder_manager = previous
+        app.response_cache.clear()
+        shutil.rmtree(directory)
+
+def test_concurrent_processes_lose_no_updates():
+    """Processes sharing one database neither lose updates nor keep serving stale data"""
+    for storage in ('json', 'sqlite'):
+        manager, directory = make_manager(SAMPLE_BIDDERS, storage=storage)
+        try:
+            processes = [multiprocessing.Process(target=stress_worker, args=(manager.database_path, storage, worker))
+                         for worker in range(STRESS_PROCESSES)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join(60)
+                assert process.exitcode == 0, storage
+
+            # The long-lived manager picks the other processes' writes up without restarting
+            total = STRESS_PROCESSES * STRESS_UPDATES
+            assert manager.get_bidder_stats()['total_bidders'] == len(SAMPLE_BIDDERS) + total + 1, storage
+            assert manager.get_bidder_by_name('Shared Bidder')['usage_count'] == total, storage
+            assert manager.search_bidders('worker 3 bidder 7')[0]['name'] == 'Worker 3 Bidder 7'
+
+            manager.update_bidder_usage('Shared Bidder')
+            reloaded = BidderManager(manager.database_path, storage=storage)
+            assert reloaded.bidders == manager.bidders, storage
+            assert reloaded.bidders['Shared Bidder']['usage_count'] == total + 1, storage
+            manager.store.close()
+            reloaded.store.close()
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    for test in (test_search_ranks_by_match_quality_then_recency, test_search_matches_full_scan,
+                 test_usage_updates_keep_indexes_current, test_suggestions_use_prefix_index,
+                 test_batched_usage_is_one_write, test_popular_bidders_follow_usage,
+                 test_recent_bidders_use_recency_index, test_stats_are_maintained_incrementally,
+                 test_bulk_index_build_matches_incremental_indexing,
+                 test_sqlite_storage_imports_json_and_upserts, test_save_bidders_keeps_other_processes_updates,
+                 test_concurrent_processes_lose_no_updates,
+                 test_app_import_defers_singletons, test_bidder_api_serves_cached_responses_with_etags,
+                 test_bidder_api_does_not_cache_failed_reads, test_metrics_count_bidders_saved_by_other_processes,
+                 test_bidder_pages_cover_every_bidder_once):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Test script for template generation: background jobs, parallel, streamed and batch bundles
+"""
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from batch_processor import process_batch
+from sample_workbooks import write_sample_workbook
+from app import (JobQueue, QueueFullError, ProgressTracker, generate_templates_batch, stream_template_bundle, TEMPLATE_TYPES,
+                 get_app_analytics, warm_up)
+
+def wait_for(queue, job_id, timeout=5):
+    """Poll a job until it leaves the queued/running states"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in ('completed', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish in {timeout}s")
+
+def test_job_results_and_failures():
+    """Completed jobs expose their result and failed jobs their error message"""
+    queue = JobQueue(workers=2, queue_size=2)
+    ok_id = queue.submit(lambda job_id, value: {'value': value, 'job': job_id}, 42)
+    bad_id = queue.submit(lambda job_id: 1 / 0)
+
+    ok = wait_for(queue, ok_id)
+    assert ok['status'] == 'completed'
+    assert ok['result'] == {'value': 42, 'job': ok_id}
+
+    bad = wait_for(queue, bad_id)
+    assert bad['status'] == 'failed'
+    assert 'division by zero' in bad['error']
+    assert queue.get('missing') is None
+
+def test_queue_full_applies_backpressure():
+    """Submitting beyond workers + queue_size raises QueueFullError until a slot frees up"""
+    release = threading.Event()
+    queue = JobQueue(workers=1, queue_size=1)
+    first = queue.submit(lambda job_id: release.wait(5))
+    queue.submit(lambda job_id: None)
+    try:
+        queue.submit(lambda job_id: None)
+    except QueueFullError:
+        pass
+    else:
+        raise AssertionError("Expected QueueFullError when the queue is full")
+    finally:
+        release.set()
+
+    wait_for(queue, first)
+    wait_for(queue, queue.submit(lambda job_id: None))
+
+def test_job_state_is_shared_between_workers():
+    """A job and its progress accepted by one worker can be polled through another worker's queue and tracker"""
+    state_dir = tempfile.mkdtemp()
+    try:
+        tracker, other_tracker = ProgressTracker(state_dir=state_dir), ProgressTracker(state_dir=state_dir)
+        queue, other_queue = JobQueue(workers=1, state_dir=state_dir), JobQueue(workers=1, state_dir=state_dir)
+        release = threading.Event()
+
+        def job(job_id):
+            tracker.start_task(job_id, 2, shared=True)
+            tracker.update_progress(job_id, 1, 'halfway')
+            release.wait(5)
+            tracker.complete_task(job_id, True)
+            return {'download_url': f'/download/{job_id}.zip'}
+
+        job_id = queue.submit(job)
+        deadline = time.time() + 5
+        while other_tracker.get_progress(job_id).get('current') != 1 and time.time() < deadline:
+            time.sleep(0.01)
+        assert other_tracker.get_progress(job_id)['messages'] == ['halfway']
+        assert other_queue.get(job_id)['status'] == 'running'
+        release.set()
+
+        wait_for(queue, job_id)
+        assert other_queue.get(job_id)['result'] == {'download_url': f'/download/{job_id}.zip'}
+        assert other_tracker.get_progress(job_id)['status'] == 'completed'
+        assert other_queue.get('missing') is None and other_tracker.get_progress('missing') == {}
+
+        tracker.start_task('local_only', 1)
+        assert other_tracker.get_progress('local_only') == {}
+    finally:
+        shutil.rmtree(state_dir)
+
+def test_progress_tracker_is_bounded():
+    """The tracker keeps at most max_tasks tasks and max_messages messages, and expires finished tasks"""
+    tracker = ProgressTracker(max_tasks=3, ttl=60, max_messages=2)
+    for n in range(5):
+        tracker.start_task(f'task_{n}', 3)
+    assert list(tracker.progress) == ['task_2', 'task_3', 'task_4']
+
+    for step in range(1, 4):
+        tracker.update_progress('task_2', step, f'step {step}')
+    tracker.start_task('task_5', 1)
+    assert 'task_2' in tracker.progress and 'task_3' not in tracker.progress
+    assert tracker.get_progress('task_2')['messages'] == ['step 2', 'step 3']
+    assert tracker.get_progress('task_3') == {}
+
+    expiring = ProgressTracker(ttl=0)
+    expiring.start_task('done', 1)
+    expiring.complete_task('done', True)
+    assert expiring.get_progress('done')['status'] == 'completed'
+    time.sleep(0.01)
+    expiring.start_task('next', 1)
+    assert list(expiring.progress) == ['next']
+
+def test_parallel_generation_keeps_order_and_reports_failures():
+    """Process-parallel generation returns files in template order and re-raises child errors"""
+    output_root = tempfile.mkdtemp()
+    try:
+        data = {'nit_info': {'nit_number': 'TEST-1'}, 'works': [{'name': 'WORK 1'}]}
+        items = [(data, os.path.join(output_root, f'nit_{n}')) for n in range(2)]
+        files = generate_templates_batch(items, parallel=True)
+        assert [[os.path.basename(path) for path in nit_files] for nit_files in files] == \
+            [[f'{template_type}_template.xlsx' for template_type in TEMPLATE_TYPES]] * 2
+        assert all(os.path.getsize(path) > 0 for nit_files in files for path in nit_files)
+
+        try:
+            generate_templates_batch([({'works': []}, os.path.join(output_root, 'broken'))], parallel=True)
+        except KeyError as e:
+            assert 'nit_info' in str(e)
+        else:
+            raise AssertionError("Expected the child process KeyError to be re-raised")
+    finally:
+        shutil.rmtree(output_root)
+
+def test_template_pool_is_sized_per_host():
+    """Worker processes split the host's template processes instead of each starting one per CPU"""
+    import app
+
+    saved = app.TEMPLATE_PROCESSES, app.WEB_CONCURRENCY
+    try:
+        app.TEMPLATE_PROCESSES, app.WEB_CONCURRENCY = 8, 3
+        assert app.template_pool_size() == 2
+        app.TEMPLATE_PROCESSES, app.WEB_CONCURRENCY = 2, 4
+        assert app.template_pool_size() == 1
+        app.TEMPLATE_PROCESSES, app.WEB_CONCURRENCY = 0, 1
+        assert app.template_pool_size() == (os.cpu_count() or 1)
+    finally:
+        app.TEMPLATE_PROCESSES, app.WEB_CONCURRENCY = saved
+
+def baseline_excel_template(data, template_type, output_path):
+    """create_excel_template as it was before template skeletons, kept as the reference output"""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(output_path)
+    header_format = workbook.add_format({'bold': True, 'align': 'center', 'valign': 'vcenter', 'border': 1,
+                                         'bg_color': '#4472C4', 'font_color': 'white', 'font_size': 12})
+    cell_format = workbook.add_format({'align': 'left', 'valign': 'vcenter', 'border': 1, 'font_size': 11})
+    number_format = workbook.add_format({'align': 'right', 'valign': 'vcenter', 'border': 1,
+                                         'num_format': '0.00', 'font_size': 11})
+    worksheet = workbook.add_worksheet()
+    if template_type == 'comparison':
+        worksheet.set_landscape()
+        worksheet.set_paper(9)
+        worksheet.fit_to_pages(1, 0)
+    else:
+        worksheet.set_portrait()
+        worksheet.set_paper(9)
+        worksheet.fit_to_pages(1, 1)
+    worksheet.merge_range('A1:D1', f"{template_type.upper()} TEMPLATE", header_format)
+    worksheet.write(2, 0, 'NIT Number:', header_format)
+    worksheet.write(2, 1, data['nit_info'].get('nit_number', 'N/A'), cell_format)
+    for column, heading in enumerate(['Work Name', 'Number of Bidders', 'Bidder Percentiles', 'Remarks']):
+        worksheet.write(4, column, heading, header_format)
+    row = 5
+    for work in data['works']:
+        worksheet.write(row, 0, work['name'], cell_format)
+        worksheet.write(row, 1, '', number_format)
+        worksheet.write(row, 2, '', cell_format)
+        worksheet.write(row, 3, '', cell_format)
+        row += 1
+    if template_type == 'comparison' and os.path.exists('Attached_assets/box.png'):
+        worksheet.insert_image(row + 2, 0, 'Attached_assets/box.png',
+                               {'x_offset': 10, 'y_offset': 10, 'x_scale': 0.8, 'y_scale': 0.8, 'positioning': 1})
+    for columns, width in (('A:A', 30), ('B:B', 20), ('C:C', 25), ('D:D', 30)):
+        worksheet.set_column(columns, width)
+    workbook.close()
+
+def test_skeleton_templates_match_baseline_output():
+    """Skeleton-built workbooks are part for part identical to the pre-skeleton output (creation time aside)"""
+    import zipfile
+    from app import create_excel_template
+
+    data = {'nit_info': {'nit_number': 'NIT/03/2025-26'}, 'works': [{'name': 'WORK 1'}, {'name': 'WORK 2'}]}
+    output_root = tempfile.mkdtemp()
+    try:
+        for template_type in TEMPLATE_TYPES:
+            expected_path = os.path.join(output_root, f'{template_type}_baseline.xlsx')
+            actual_path = os.path.join(output_root, f'{template_type}_skeleton.xlsx')
+            baseline_excel_template(data, template_type, expected_path)
+            create_excel_template(data, template_type, actual_path)
+            with zipfile.ZipFile(expected_path) as expected, zipfile.ZipFile(actual_path) as actual:
+                assert sorted(expected.namelist()) == sorted(actual.namelist()), template_type
+                for name in expected.namelist():
+                    if name != 'docProps/core.xml':
+                        assert expected.read(name) == actual.read(name), (template_type, name)
+    finally:
+        shutil.rmtree(output_root)
+
+def test_streamed_bundle_is_a_valid_zip():
+    """The streamed bundle arrives in several chunks and unzips to one workbook per template"""
+    import zipfile
+
+    data = {'nit_info': {'nit_number': 'TEST-1'}, 'works': [{'name': 'WORK 1'}]}
+    chunks = list(stream_template_bundle(data))
+    assert len([chunk for chunk in chunks if chunk]) >= len(TEMPLATE_TYPES)
+
+    with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as bundle:
+        assert bundle.namelist() == [f'{template_type}_template.xlsx' for template_type in TEMPLATE_TYPES]
+        assert bundle.testzip() is None
+
+def test_batch_bundle_and_manifest():
+    """A batch reports per-file success and errors and bundles every generated workbook"""
+    import json
+    import zipfile
+
+    path = write_sample_workbook()
+    output_root = tempfile.mkdtemp()
+    try:
+        with open(path, 'rb') as f:
+            payload = f.read()
+        inputs = [('a.xlsx', payload), ('broken.xlsx', b'not a workbook'), ('a.xlsx', payload)]
+        summary = process_batch(inputs, os.path.join(output_root, 'batch'), workers=2)
+
+        assert [entry['status'] for entry in summary['manifest']] == ['success', 'error', 'success']
+        assert (summary['succeeded'], summary['failed']) == (2, 1)
+        with zipfile.ZipFile(summary['zip_path']) as bundle:
+            names = bundle.namelist()
+            assert json.loads(bundle.read('manifest.json'))['total'] == 3
+        assert len(names) == 2 * len(TEMPLATE_TYPES) + 1
+        assert '001_a/comparison_template.xlsx' in names and '003_a/comparison_template.xlsx' in names
+    finally:
+        os.remove(path)
+        shutil.rmtree(output_root)
+
+def test_warm_up_runs_once_without_recording_latency():
+    """Warm-up exercises parse and generate once per process and leaves the latency histograms untouched"""
+    recorder = get_app_analytics().latency
+    version = recorder.version
+    timings = warm_up()
+    assert {'imports', 'bidders', 'parse', 'generate'} <= set(timings)
+    assert warm_up() == {}
+    assert get_app_analytics().latency is recorder and recorder.version == version
+
+def test_zip_limits_are_checked_before_reading():
+    """Archives over the member count or uncompressed size limits are rejected from their directory alone; extraction streams to numbered files"""
+    from batch_processor import expand_zip, extract_zip, BatchLimitError
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as bundle:
+        for n in range(3):
+            bundle.writestr(f'nit_{n}.xlsx', b'\0' * 1000)
+    for limits in ({'max_members': 2}, {'max_member_size': 999}, {'max_total_size': 2999}):
+        archive.seek(0)
+        try:
+            expand_zip(archive, **limits)
+        except BatchLimitError:
+            pass
+        else:
+            raise AssertionError(f"Expected BatchLimitError for {limits}")
+    archive.seek(0)
+    assert [name for name, _ in expand_zip(archive, max_members=3, max_total_size=3000)] == \
+        ['nit_0.xlsx', 'nit_1.xlsx', 'nit_2.xlsx']
+
+    directory = tempfile.mkdtemp()
+    try:
+        archive.seek(0)
+        try:
+            extract_zip(archive, directory, max_total_size=2999)
+        except BatchLimitError:
+            assert os.listdir(directory) == []
+        else:
+            raise AssertionError("Expected BatchLimitError from extract_zip")
+        archive.seek(0)
+        inputs = extract_zip(archive, directory, start=5)
+        assert [name for name, _ in inputs] == ['nit_0.xlsx', 'nit_1.xlsx', 'nit_2.xlsx']
+        assert [os.path.basename(path) for _, path in inputs] == ['0005', '0006', '0007']
+        assert all(os.path.getsize(path) == 1000 for _, path in inputs)
+    finally:
+        shutil.rmtree(directory)
+
+def test_batch_route_queues_a_job():
+    """/batch answers 202 with a job id right away and the job's result carries the manifest and download URL"""
+    import app
+
+    path = write_sample_workbook()
+    try:
+        with open(path, 'rb') as f:
+            payload = f.read()
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as bundle:
+            bundle.writestr('nested/a.xlsx', payload)
+        archive.seek(0)
+        client = app.app.test_client()
+        response = client.post('/batch', data={'files': [(io.BytesIO(payload), 'a.xlsx'),
+                                                         (io.BytesIO(b'junk'), 'b.xlsx'),
+                                                         (archive, 'more.zip')]})
+        assert response.status_code == 202 and response.get_json()['files'] == 3
+        job = wait_for(app.generation_queue, response.get_json()['job_id'], timeout=30)
+        assert job['status'] == 'completed'
+        assert (job['result']['succeeded'], job['result']['failed']) == (2, 1)
+        assert job['result']['download_url'].startswith('/download/batch_')
+        assert app.progress_tracker.get_progress(response.get_json()['job_id'])['current'] == 3
+
+        # The spooled workbooks are gone once the batch is done
+        zip_file = job['result']['zip_file']
+        batch_dir = os.path.join(app.OUTPUT_FOLDER, os.path.splitext(zip_file)[0])
+        assert not os.path.exists(os.path.join(batch_dir, '.inputs'))
+        os.remove(os.path.join(app.OUTPUT_FOLDER, zip_file))
+        shutil.rmtree(batch_dir)
+
+        # A rejected archive leaves no batch folder behind
+        batches = set(os.listdir(app.OUTPUT_FOLDER))
+        assert client.post('/batch', data={'files': [(io.BytesIO(b'not a zip'), 'bad.zip')]}).status_code == 400
+        assert set(os.listdir(app.OUTPUT_FOLDER)) == batches
+    finally:
+        os.remove(path)
+
+def test_async_generate_records_usage_only_for_accepted_jobs():
+    """/generate?async=1 answers 202 and records bidder usage once; a full queue answers 429 and records nothing"""
+    import app
+    import bidder_manager
+
+    directory = tempfile.mkdtemp()
+    manager = bidder_manager.BidderManager(os.path.join(directory, 'bidder_database.json'))
+    release = threading.Event()
+    previous = (bidder_manager._bidder_manager, app.generation_queue, app.run_generation_job)
+    bidder_manager._bidder_manager = manager
+    app.generation_queue = JobQueue(workers=1, queue_size=0)
+    app.run_generation_job = lambda job_id, data, bundle_name: release.wait(5)
+    try:
+        client = app.app.test_client()
+        data = {'works': [{'name': 'Work 1', 'bidders': [{'name': 'Queued Bidder', 'percentile': 5, 'address': 'Kota'}]}]}
+        accepted = client.post('/generate?async=1', json={'data': data})
+        assert accepted.status_code == 202
+        for _ in range(3):
+            rejected = client.post('/generate?async=1', json={'data': data})
+            assert rejected.status_code == 429 and rejected.headers['Retry-After']
+        assert manager.bidders['Queued Bidder']['usage_count'] == 1
+
+        release.set()
+        assert wait_for(app.generation_queue, accepted.get_json()['job_id'])['status'] == 'completed'
+    finally:
+        release.set()
+        bidder_manager._bidder_manager, app.generation_queue, app.run_generation_job = previous
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    for test in (test_job_results_and_failures, test_queue_full_applies_backpressure, test_job_state_is_shared_between_workers,
+                 test_progress_tracker_is_bounded,
+                 test_parallel_generation_keeps_order_and_reports_failures, test_template_pool_is_sized_per_host,
+                 test_skeleton_templates_match_baseline_output, test_streamed_bundle_is_a_valid_zip,
+                 test_batch_bundle_and_manifest, test_zip_limits_are_checked_before_reading, test_batch_route_queues_a_job,
+                 test_async_generate_records_usage_only_for_accepted_jobs, test_warm_up_runs_once_without_recording_latency):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script for NIT input parsing
+Builds small workbooks on the fly so no sample input files are needed
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import parse_input_file, parse_input_bytes, parse_input_file_cached, parse_cache, ParseCache, PARSER_BACKENDS
+from sample_workbooks import SAMPLE_ROWS, write_sample_workbook
+
+def test_parse_extracts_nit_and_works():
+    """NIT number is taken from the row after the label and only numbered work rows are kept"""
+    path = write_sample_workbook()
+    try:
+        for backend in PARSER_BACKENDS:
+            data = parse_input_file(path, backend=backend)
+            assert data['nit_info'] == {'nit_number': 'NIT/03/2025-26'}, backend
+            assert data['works'] == [
+                {'name': 'Work 1 - Street lighting', 'row_index': 4},
+                {'name': 'WORK 2 - Pump house', 'row_index': 6},
+            ], backend
+    finally:
+        os.remove(path)
+
+def test_parse_bytes_matches_file():
+    """Parsing the workbook bytes in memory gives the same result as parsing the saved file"""
+    path = write_sample_workbook()
+    try:
+        with open(path, 'rb') as f:
+            payload = f.read()
+        for backend in PARSER_BACKENDS:
+            from_file = parse_input_file(path, backend=backend)
+            from_bytes = parse_input_bytes(payload, 'nit.xlsx', backend=backend)
+            assert from_bytes['filename'] == 'nit.xlsx'
+            assert (from_bytes['nit_info'], from_bytes['works']) == (from_file['nit_info'], from_file['works']), backend
+    finally:
+        os.remove(path)
+
+def test_streaming_stops_after_works_section():
+    """The streaming backend ignores work-like rows past the blank gap that ends the works section"""
+    trailer = [[None, None, None]] * 12 + [[None, 'Work 99 in annexure', None]]
+    path = write_sample_workbook(SAMPLE_ROWS + trailer)
+    try:
+        pandas_data = parse_input_file(path, backend='pandas')
+        streaming_data = parse_input_file(path, backend='streaming')
+    finally:
+        os.remove(path)
+
+    assert [work['name'] for work in pandas_data['works']][-1] == 'Work 99 in annexure'
+    assert streaming_data['works'] == pandas_data['works'][:-1]
+
+def test_parse_rejects_sheet_without_works():
+    """A sheet with no work rows is reported as a parse failure"""
+    path = write_sample_workbook(SAMPLE_ROWS[:4])
+    try:
+        parse_input_file(path)
+    except ValueError as e:
+        assert 'No works data found' in str(e)
+    else:
+        raise AssertionError("Expected ValueError for a sheet without works")
+    finally:
+        os.remove(path)
+
+def test_cache_is_keyed_on_content_not_path():
+    """Re-uploading the same bytes hits the cache; new bytes under the same path do not"""
+    path = write_sample_workbook()
+    disk_dir, parse_cache.disk_dir = parse_cache.disk_dir, None
+    try:
+        parse_cache.clear()
+        first = parse_input_file_cached(path)
+        second = parse_input_file_cached(path)
+        assert not first['cached'] and second['cached']
+        assert second['works'] == first['works']
+
+        changed = SAMPLE_ROWS + [[3, 'Work 3 - Boundary wall', 1000]]
+        os.replace(write_sample_workbook(changed), path)
+        third = parse_input_file_cached(path)
+        assert not third['cached']
+        assert len(third['works']) == 3
+    finally:
+        parse_cache.disk_dir = disk_dir
+        os.remove(path)
+
+def test_cache_eviction_and_disk_tier():
+    """Entries are evicted by size and TTL, and the disk tier survives a cold memory tier"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ParseCache(max_entries=2, ttl=60, disk_dir=cache_dir)
+        for key in ('a', 'b', 'c'):
+            cache.put(key, {'works': [key]})
+        assert list(cache.entries) == ['b', 'c']
+        assert sorted(os.listdir(cache_dir)) == ['b.json', 'c.json']
+
+        cache.clear()
+        assert cache.get('b') == {'works': ['b']}
+        assert cache.get('a') is None
+        assert cache.stats()['disk_hits'] == 1 and cache.stats()['misses'] == 1
+
+        expired = ParseCache(ttl=-1)
+        expired.put('x', {'works': []})
+        assert expired.get('x') is None
+
+if __name__ == "__main__":
+    for test in (test_parse_extracts_nit_and_works, test_parse_bytes_matches_file, test_streaming_stops_after_works_section,
+                 test_parse_rejects_sheet_without_works, test_cache_is_keyed_on_content_not_path,
+                 test_cache_eviction_and_disk_tier):
+        test()
+        print(f"✅ {test.__name__}")